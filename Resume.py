@@ -1,50 +1,75 @@
-import PyPDF2
-import docx  # For DOCX
+import io
 import os
 import re
 import logging
 import json
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterable, Iterator, Sequence, Union, BinaryIO
 from collections import Counter
-from transformers import pipeline
-from datetime import datetime
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import pandas as pd
-
-# Download NLTK resources
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-except:
-    pass
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from analysis_cache import cache_from_env, content_hash
+from analysis_result import AnalysisResult, ContactInfo, SkillMatch, render_result
+from metrics import SUMMARY_FALLBACKS, StageTimer
+from model_manager import MODEL_SPECS, models_from_env
+from semantic_skills import semantic_from_env
+from chunked_summary import chunked_from_env
+from summary_queue import batcher_from_env
+from taxonomy import SkillMatcher, Taxonomy, taxonomy_from_env
+
+# PyPDF2 and docx_reader (zipfile, XML parser) are imported by the extractors on first use, and
+# transformers/torch only when a model is loaded, so importing this module for rule-based scoring
+# stays fast
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global variables for models
+# Shared model loader, configured by RESUME_MODELS / RESUME_MODEL_IDLE_TIMEOUT / RESUME_MODEL_SOCKET
+model_manager = models_from_env()
+
+# Optional manual overrides; when left as None the model manager's pipelines are used
 summarizer = None
 generator = None
 
 
 # Initialize models with better error handling
 def initialize_models():
-    global summarizer, generator
-    try:
-        print("Loading models...")
-        summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-        generator = pipeline("text2text-generation", model="google/flan-t5-base")
+    """Load both pipelines now, blocking until they are ready (or have failed)"""
+    print("Loading models...")
+    model_manager.warm(block=True)
+    if model_manager.is_loaded("summarizer"):
         print("Transformers models loaded successfully")
-    except Exception as e:
-        logger.error(f"Transformers model loading failed: {e}")
-        print(f"Warning: Model loading failed: {e}")
-        summarizer = None
-        generator = None
+    else:
+        print("Warning: Model loading failed, continuing with basic summaries")
+
+
+def get_summarizer():
+    """Summarizer pipeline if ready; otherwise starts loading it in the background and returns None"""
+    return summarizer or model_manager.get("summarizer")
+
+
+def get_generator():
+    """Text generation pipeline if ready; otherwise starts loading it in the background and returns None"""
+    return generator or model_manager.get("generator")
+
 
+def get_embedder():
+    """Sentence-embedding pipeline if ready; otherwise starts loading it in the background and returns None"""
+    return model_manager.get("embedder")
 
-# Enhanced role-based skill sets with weights
+
+# Optional semantic skill matching, enabled by RESUME_SEMANTIC_SKILLS (None when off)
+semantic_matcher = semantic_from_env(get_embedder, MODEL_SPECS["embedder"][1])
+
+# Micro-batches concurrent summarization requests into single pipeline calls
+summary_queue = batcher_from_env(get_summarizer, max_length=150, min_length=30, do_sample=False)
+
+# Map-reduce summaries of the whole resume, enabled by RESUME_SUMMARY_MODE=chunked (None: first 1000 characters)
+chunked_summarizer = chunked_from_env(summary_queue)
+
+
+# Built-in role-based skill sets with weights, used when RESUME_TAXONOMY does not point to a file
 ROLE_SKILLS = {
     "Data Analyst": {
         "core": ["SQL", "Python", "Excel", "Statistics", "Data Visualization"],
@@ -87,46 +112,251 @@ INDUSTRY_KEYWORDS = {
     "Education": ["teaching", "curriculum", "student", "academic", "learning"]
 }
 
+# Skills used when no known role is detected
+DEFAULT_SKILLS = {
+    "core": ["Communication", "Teamwork", "Problem Solving"],
+    "important": ["Leadership", "Time Management", "Adaptability"],
+    "nice_to_have": ["Innovation", "Customer Service", "Technical Skills"]
+}
 
-logger = logging.getLogger(__name__)
+SKILL_WEIGHTS = {"core": 3, "important": 2, "nice_to_have": 1}
+
+
+# The taxonomy in use: the built-in one above, or the file in RESUME_TAXONOMY (reloaded when it changes)
+taxonomy_store = taxonomy_from_env(Taxonomy(ROLE_SKILLS, DEFAULT_SKILLS, SKILL_WEIGHTS, industries=INDUSTRY_KEYWORDS))
+
+
+def get_taxonomy() -> Taxonomy:
+    """Current compiled taxonomy; take it once per analysis so a reload cannot change it midway"""
+    return taxonomy_store.get()
+
+
+@lru_cache(maxsize=128)
+def _compile_skill_matcher(terms: Tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(terms)
+
+
+def get_skill_matcher(terms: Iterable[str]) -> SkillMatcher:
+    """Return a cached SkillMatcher for the given terms"""
+    return _compile_skill_matcher(tuple(sorted({t.lower() for t in terms if t})))
+
+
+def _taxonomy_terms() -> List[str]:
+    return list(get_taxonomy().terms)
+
+
+def count_skill_hits(text: str, taxonomy: Optional[Taxonomy] = None) -> Dict[str, int]:
+    """Single pass over text counting every role name and skill in the taxonomy (aliases count as their skill)"""
+    if not isinstance(text, str):
+        text = str(text) if text is not None else ""
+    return (taxonomy or get_taxonomy()).count(text)
+
+
+# Precompiled regex bank shared by the contact, experience and ATS extractors.
+# Phone and experience patterns are listed in priority order.
+PHONE_PATTERNS = [
+    r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{4}',
+    r'\(\d{3}\)\s?\d{3}[-.\s]?\d{4}',
+    r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
+    r'\b\d{10}\b',
+    r'\d{3}\.\d{3}\.\d{4}',
+    r'\d{3}\s\d{3}\s\d{4}',
+    r'\+\d{1,3}\s?\d{3,4}\s?\d{3,4}\s?\d{4}',
+    r'\d{4}[-.\s]?\d{3}[-.\s]?\d{3}',
+]
+# Only the first patterns count as a well formatted number for ATS purposes
+ATS_PHONE_PATTERN_COUNT = 6
 
-def extract_text_from_pdf(file_path: str) -> str:
+EXPERIENCE_PATTERNS = [
+    r'(\d+)\+?\s*years?\s*of\s*experience',
+    r'(\d+)\+?\s*years?\s*experience',
+    r'experience\s*:?\s*(\d+)\+?\s*years?',
+    r'(\d+)\+?\s*yrs?\s*exp',
+]
+
+DATE_PATTERNS = [
+    r'\b\d{4}\s*[-–]\s*\d{4}\b',
+    r'\b\d{1,2}/\d{4}\s*[-–]\s*\d{1,2}/\d{4}\b',
+    r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{4}\b',
+    r'\b\d{4}\s*[-–]\s*present\b',
+]
+
+ATS_SECTIONS = [
+    ("experience", "Experience section"),
+    ("education", "Education section"),
+    ("skills", "Skills section"),
+]
+
+
+def _priority_pattern(patterns: List[str], flags: int = 0, prefix: str = "") -> re.Pattern:
+    """Combine patterns into one zero-width scan that records the first matching pattern at each position.
+
+    Scanning once and keeping the highest-priority pattern found anywhere gives the same
+    answer as trying each pattern with re.findall in order.
+    """
+    alternatives = "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns))
+    return re.compile(f"{prefix}(?=(?:{alternatives}))", flags)
+
+
+REGEX_BANK = {
+    "email": re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    "phone": _priority_pattern(PHONE_PATTERNS, prefix=r'(?=[\d(+])'),
+    "linkedin": re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE),
+    "experience": _priority_pattern(
+        [p.replace("(\\d+)", f"(?P<y{i}>\\d+)") for i, p in enumerate(EXPERIENCE_PATTERNS)],
+        re.IGNORECASE, prefix=r'(?=[\de])'),
+    "date": re.compile("|".join(DATE_PATTERNS), re.IGNORECASE),
+    "section": re.compile(r'\b(experience|education|skills?)\b', re.IGNORECASE),
+    "special_char": re.compile(r'[^\w\s\-\.\,\(\)\@]'),
+}
+
+
+@dataclass
+class TextFacts:
+    """Everything the regex extractors need from a resume, gathered in one scan per pattern"""
+    emails: List[str] = field(default_factory=list)
+    # Phone pattern index -> first match of that pattern
+    phones: Dict[int, str] = field(default_factory=dict)
+    linkedin: List[str] = field(default_factory=list)
+    experience_years: Optional[int] = None
+    # Index of the EXPERIENCE_PATTERNS entry experience_years came from
+    experience_pattern: Optional[int] = None
+    has_dates: bool = False
+    sections: set = field(default_factory=set)
+    word_count: int = 0
+    special_char_count: int = 0
+    length: int = 0
+
+    @property
+    def phone(self) -> Optional[str]:
+        """Best phone match, by pattern priority"""
+        return self.phones[min(self.phones)] if self.phones else None
+
+    @property
+    def has_ats_phone(self) -> bool:
+        return any(index < ATS_PHONE_PATTERN_COUNT for index in self.phones)
+
+
+def extract_text_facts(text: str) -> TextFacts:
+    """Run every pattern in REGEX_BANK over text once and collect the results"""
+    if not isinstance(text, str):
+        text = str(text) if text is not None else ""
+
+    facts = TextFacts(length=len(text), word_count=len(text.split()))
+    facts.emails = REGEX_BANK["email"].findall(text)
+    facts.linkedin = REGEX_BANK["linkedin"].findall(text)
+
+    for match in REGEX_BANK["phone"].finditer(text):
+        index = int(match.lastgroup[1:])
+        if index not in facts.phones:
+            facts.phones[index] = match.group(match.lastgroup)
+
+    best_experience = None
+    for match in REGEX_BANK["experience"].finditer(text):
+        index = int(match.lastgroup[1:])
+        if best_experience is None or index < best_experience[0]:
+            best_experience = (index, int(match.group(f"y{index}")))
+            if index == 0:
+                break
+    if best_experience:
+        facts.experience_pattern, facts.experience_years = best_experience
+
+    facts.has_dates = REGEX_BANK["date"].search(text) is not None
+    facts.sections = {"skills" if m.lower().startswith("skill") else m.lower()
+                      for m in REGEX_BANK["section"].findall(text)}
+    facts.special_char_count = len(REGEX_BANK["special_char"].findall(text))
+    return facts
+
+
+def merge_text_facts(parts: Sequence[TextFacts]) -> TextFacts:
+    """TextFacts of several texts joined with newlines, built from the facts of each text.
+
+    Equal to extract_text_facts on the joined text as long as no match spans
+    two parts, which holds when the parts are split at line boundaries.
+    """
+    merged = TextFacts(length=max(0, len(parts) - 1))
+    for facts in parts:
+        merged.emails.extend(facts.emails)
+        merged.linkedin.extend(facts.linkedin)
+        for index, phone in facts.phones.items():
+            merged.phones.setdefault(index, phone)
+        if facts.experience_pattern is not None and (merged.experience_pattern is None or
+                                                     facts.experience_pattern < merged.experience_pattern):
+            merged.experience_pattern, merged.experience_years = facts.experience_pattern, facts.experience_years
+        merged.has_dates = merged.has_dates or facts.has_dates
+        merged.sections |= facts.sections
+        merged.word_count += facts.word_count
+        merged.special_char_count += facts.special_char_count
+        merged.length += facts.length
+    return merged
+
+
+# A document can be given as a file path, raw bytes or a binary file-like object
+DocumentSource = Union[str, bytes, BinaryIO]
+
+
+def _as_stream(source: DocumentSource) -> Union[str, BinaryIO]:
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def iter_pdf_pages(source: DocumentSource, max_pages: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) for each non-empty PDF page, parsing pages only as they are consumed.
+
+    Stops after max_pages pages so long portfolios are not parsed past the part scoring needs.
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(_as_stream(source))
+    for page_num, page in enumerate(reader.pages):
+        if max_pages is not None and page_num >= max_pages:
+            break
+        page_text = page.extract_text()
+        if page_text and page_text.strip():
+            yield page_num + 1, page_text
+
+
+def extract_text_from_pdf(source: DocumentSource, max_pages: Optional[int] = None) -> str:
     """Enhanced PDF text extraction using PyPDF2 with error handling and page numbering."""
     try:
-        text = ""
-        with open(file_path, "rb") as file:
-            reader = PyPDF2.PdfReader(file)
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text and page_text.strip():
-                    text += f"\n--- Page {page_num + 1} ---\n{page_text}"
+        text = "".join(f"\n--- Page {page_num} ---\n{page_text}"
+                       for page_num, page_text in iter_pdf_pages(source, max_pages))
         return text.strip()
     except Exception as e:
         logger.error(f"Error reading PDF: {e}")
         return f"Error reading PDF: {e}"
 
-def extract_text_from_docx(file_path: str) -> str:
-    """Enhanced DOCX text extraction"""
+def extract_text_from_docx(source: DocumentSource) -> str:
+    """DOCX text extraction: paragraphs and table cells streamed in document order, merged cells once"""
     try:
-        doc = docx.Document(file_path)
-        full_text = []
+        from docx_reader import iter_docx_blocks
 
-        for para in doc.paragraphs:
-            if para.text and para.text.strip():
-                full_text.append(para.text)
-
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text and cell.text.strip():
-                        full_text.append(cell.text)
-
-        return "\n".join(full_text).strip()
+        return "\n".join(block.text for block in iter_docx_blocks(_as_stream(source))).strip()
     except Exception as e:
         logger.error(f"Error reading DOCX: {e}")
         return f"Error reading DOCX: {e}"
 
 
+def extract_text(source: DocumentSource, ext: str, max_pages: Optional[int] = None) -> str:
+    """Extract text from a PDF, DOCX or TXT document given as a path, bytes or stream (no temp files)"""
+    ext = ext.lower()
+    if ext == ".pdf":
+        return extract_text_from_pdf(source, max_pages)
+    elif ext == ".docx":
+        return extract_text_from_docx(source)
+    elif ext == ".txt":
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                data = f.read()
+        elif isinstance(source, (bytes, bytearray)):
+            data = source
+        else:
+            data = source.read()
+        return data.decode("utf-8", errors="ignore")
+    return f"Unsupported file type: {ext}. Please upload PDF or DOCX files."
+
+
 def read_file(file) -> str:
     """Enhanced file reading with validation"""
     try:
@@ -158,7 +388,7 @@ def read_file(file) -> str:
         return f"Error reading file: {str(e)}"
 
 
-def extract_contact_info(text: str) -> Dict[str, str]:
+def extract_contact_info(text: str, facts: Optional[TextFacts] = None) -> Dict[str, str]:
     """Extract contact information using regex with better error handling"""
     contact_info = {}
 
@@ -167,38 +397,13 @@ def extract_contact_info(text: str) -> Dict[str, str]:
         if not isinstance(text, str):
             text = str(text) if text is not None else ""
 
-        contact_info['name'] = extract_name_from_resume(text)
-
-        # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        contact_info['email'] = emails[0] if emails else "Not found"
-
-        # Phone extraction
-        phone_patterns = [
-            r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{4}',
-            r'\(\d{3}\)\s?\d{3}[-.\s]?\d{4}',
-            r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
-            r'\b\d{10}\b',
-            r'\d{3}\.\d{3}\.\d{4}',
-            r'\d{3}\s\d{3}\s\d{4}',
-            r'\+\d{1,3}\s?\d{3,4}\s?\d{3,4}\s?\d{4}',
-            r'\d{4}[-.\s]?\d{3}[-.\s]?\d{3}',
-        ]
-
-        phone_found = None
-        for pattern in phone_patterns:
-            phones = re.findall(pattern, text)
-            if phones:
-                phone_found = phones[0]
-                break
-
-        contact_info['phone'] = phone_found if phone_found else "Not found"
+        if facts is None:
+            facts = extract_text_facts(text)
 
-        # LinkedIn extraction
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin = re.findall(linkedin_pattern, text, re.IGNORECASE)
-        contact_info['linkedin'] = linkedin[0] if linkedin else "Not found"
+        contact_info['name'] = extract_name_from_resume(text)
+        contact_info['email'] = facts.emails[0] if facts.emails else "Not found"
+        contact_info['phone'] = facts.phone or "Not found"
+        contact_info['linkedin'] = facts.linkedin[0] if facts.linkedin else "Not found"
 
     except Exception as e:
         logger.error(f"Error extracting contact info: {e}")
@@ -258,31 +463,20 @@ def extract_name_from_resume(text: str) -> str:
     return "Name not found"
 
 
-def extract_experience_years(text: str) -> Optional[int]:
+def extract_experience_years(text: str, facts: Optional[TextFacts] = None) -> Optional[int]:
     """Extract years of experience from resume text"""
     try:
-        if not isinstance(text, str):
-            text = str(text) if text is not None else ""
-
-        patterns = [
-            r'(\d+)\+?\s*years?\s*of\s*experience',
-            r'(\d+)\+?\s*years?\s*experience',
-            r'experience\s*:?\s*(\d+)\+?\s*years?',
-            r'(\d+)\+?\s*yrs?\s*exp'
-        ]
-
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                return int(matches[0])
+        if facts is None:
+            facts = extract_text_facts(text)
+        return facts.experience_years
     except Exception as e:
         logger.error(f"Error extracting experience years: {e}")
 
     return None
 
 
-def extract_education(text: str) -> List[str]:
-    """Extract education information"""
+def extract_education(text: str, limit: Optional[int] = 3) -> List[str]:
+    """Extract education information (the first `limit` lines, or all with limit=None)"""
     try:
         if not isinstance(text, str):
             text = str(text) if text is not None else ""
@@ -303,112 +497,69 @@ def extract_education(text: str) -> List[str]:
             if any(keyword in line_lower for keyword in education_keywords):
                 education_info.append(line.strip())
 
-        return education_info[:3]
+        return education_info[:limit]
     except Exception as e:
         logger.error(f"Error extracting education: {e}")
         return []
 
 
-def detect_job_role_from_text(text: str) -> Tuple[Optional[str], float]:
+def detect_job_role_from_text(text: str, skill_hits: Optional[Dict[str, int]] = None,
+                              taxonomy: Optional[Taxonomy] = None) -> Tuple[Optional[str], float]:
     """Enhanced job role detection with confidence score"""
     try:
-        if not isinstance(text, str):
-            text = str(text) if text is not None else ""
+        taxonomy = taxonomy or get_taxonomy()
+        if skill_hits is None:
+            skill_hits = count_skill_hits(text, taxonomy)
 
-        text_lower = text.lower()
-        role_scores = {}
+        return taxonomy.detect_role(skill_hits)
 
-        for role in ROLE_SKILLS.keys():
-            role_lower = role.lower()
-            if role_lower in text_lower:
-                role_scores[role] = text_lower.count(role_lower) * 10
+    except Exception as e:
+        logger.error(f"Error detecting job role: {e}")
 
-        for role, skills_dict in ROLE_SKILLS.items():
-            score = 0
-            all_skills = skills_dict['core'] + skills_dict['important'] + skills_dict['nice_to_have']
+    return None, 0
 
-            for skill in all_skills:
-                if skill.lower() in text_lower:
-                    if skill in skills_dict['core']:
-                        score += 3
-                    elif skill in skills_dict['important']:
-                        score += 2
-                    else:
-                        score += 1
 
-            role_scores[role] = role_scores.get(role, 0) + score
+# Minimum match percentage for each level, best first
+LEVEL_THRESHOLDS = [(80, "Excellent Match"), (60, "Strong Match"), (40, "Good Match"), (20, "Partial Match")]
 
-        if role_scores:
-            best_role = max(role_scores, key=role_scores.get)
-            confidence = min(100, role_scores[best_role] * 2)
-            return best_role, confidence
 
-    except Exception as e:
-        logger.error(f"Error detecting job role: {e}")
+def match_level(percentage_score: float) -> str:
+    """Bucket a skill match percentage into a level label"""
+    for threshold, level in LEVEL_THRESHOLDS:
+        if percentage_score >= threshold:
+            return level
+    return "Needs Improvement"
 
-    return None, 0
 
-
-def advanced_skill_scoring(resume_text: str, required_skills: Dict[str, List[str]]) -> Tuple[
+def advanced_skill_scoring(resume_text: str, required_skills: Dict[str, List[str]],
+                           skill_hits: Optional[Dict[str, int]] = None,
+                           weights: Optional[Dict[str, int]] = None) -> Tuple[
     float, str, List[str], Dict[str, int]]:
     """Advanced skill scoring with weighted categories"""
     try:
-        if not isinstance(resume_text, str):
-            resume_text = str(resume_text) if resume_text is not None else ""
+        weights = weights or get_taxonomy().weights
+        if skill_hits is None:
+            all_skills = [skill for category in weights for skill in required_skills.get(category, [])]
+            skill_hits = get_skill_matcher(all_skills).count(
+                resume_text if isinstance(resume_text, str) else str(resume_text or ""))
 
         found_skills = []
         skill_counts = {}
-        resume_lower = resume_text.lower()
-
-        core_score = 0
-        important_score = 0
-        nice_score = 0
-
-        total_core_skills = len(required_skills.get('core', []))
-        total_important_skills = len(required_skills.get('important', []))
-        total_nice_skills = len(required_skills.get('nice_to_have', []))
-
-        for skill in required_skills.get('core', []):
-            skill_lower = skill.lower()
-            if skill_lower in resume_lower:
-                found_skills.append(skill)
-                count = resume_lower.count(skill_lower)
-                skill_counts[skill] = count
-                core_score += 3
-
-        for skill in required_skills.get('important', []):
-            skill_lower = skill.lower()
-            if skill_lower in resume_lower:
-                found_skills.append(skill)
-                count = resume_lower.count(skill_lower)
-                skill_counts[skill] = count
-                important_score += 2
-
-        for skill in required_skills.get('nice_to_have', []):
-            skill_lower = skill.lower()
-            if skill_lower in resume_lower:
-                found_skills.append(skill)
-                count = resume_lower.count(skill_lower)
-                skill_counts[skill] = count
-                nice_score += 1
-
-        total_possible_score = (total_core_skills * 3) + (total_important_skills * 2) + (total_nice_skills * 1)
-        actual_score = core_score + important_score + nice_score
+        actual_score = 0
+        total_possible_score = 0
+
+        for category, weight in weights.items():
+            for skill in required_skills.get(category, []):
+                total_possible_score += weight
+                count = skill_hits.get(skill.lower(), 0)
+                if count:
+                    found_skills.append(skill)
+                    skill_counts[skill] = count
+                    actual_score += weight
 
         percentage_score = (actual_score / total_possible_score) * 100 if total_possible_score > 0 else 0
 
-        if percentage_score >= 80:
-            level = "Excellent Match"
-        elif percentage_score >= 60:
-            level = "Strong Match"
-        elif percentage_score >= 40:
-            level = "Good Match"
-        elif percentage_score >= 20:
-            level = "Partial Match"
-        else:
-            level = "Needs Improvement"
-
-        return min(100, percentage_score), level, found_skills, skill_counts
+        return min(100, percentage_score), match_level(percentage_score), found_skills, skill_counts
 
     except Exception as e:
         logger.error(f"Error in skill scoring: {e}")
@@ -461,35 +612,24 @@ def generate_detailed_feedback(score: float, found: List[str], required: Dict[st
         return f"Error generating feedback: {str(e)}"
 
 
-def generate_ats_score(resume_text: str) -> Tuple[int, List[str]]:
+def generate_ats_score(resume_text: str, facts: Optional[TextFacts] = None) -> Tuple[int, List[str]]:
     """Generate comprehensive ATS compatibility score"""
     try:
-        if not isinstance(resume_text, str):
-            resume_text = str(resume_text) if resume_text is not None else ""
+        if facts is None:
+            facts = extract_text_facts(resume_text)
 
         ats_issues = []
         score = 100
 
-        email_found = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text)
-        if not email_found:
+        if not facts.emails:
             ats_issues.append("Email address missing")
             score -= 15
 
-        phone_patterns = [
-            r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{4}',
-            r'\(\d{3}\)\s?\d{3}[-.\s]?\d{4}',
-            r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
-            r'\b\d{10}\b',
-            r'\d{3}\.\d{3}\.\d{4}',
-            r'\d{3}\s\d{3}\s\d{4}',
-        ]
-
-        phone_found = any(re.search(pattern, resume_text) for pattern in phone_patterns)
-        if not phone_found:
+        if not facts.has_ats_phone:
             ats_issues.append("Phone number missing or poorly formatted")
             score -= 10
 
-        word_count = len(resume_text.split())
+        word_count = facts.word_count
         if word_count < 200:
             ats_issues.append("Resume too short (less than 200 words)")
             score -= 15
@@ -497,30 +637,16 @@ def generate_ats_score(resume_text: str) -> Tuple[int, List[str]]:
             ats_issues.append("Resume too long (over 1000 words)")
             score -= 5
 
-        special_chars = len(re.findall(r'[^\w\s\-\.\,\(\)\@]', resume_text))
-        if special_chars > len(resume_text) * 0.05:
+        if facts.special_char_count > facts.length * 0.05:
             ats_issues.append("Too many special characters")
             score -= 10
 
-        sections_to_check = [
-            (r'\bexperience\b', "Experience section"),
-            (r'\beducation\b', "Education section"),
-            (r'\bskills?\b', "Skills section"),
-        ]
-
-        for pattern, section_name in sections_to_check:
-            if not re.search(pattern, resume_text, re.IGNORECASE):
+        for section, section_name in ATS_SECTIONS:
+            if section not in facts.sections:
                 ats_issues.append(f"{section_name} not clearly marked")
                 score -= 8
 
-        date_patterns = [
-            r'\b\d{4}\s*[-–]\s*\d{4}\b',
-            r'\b\d{1,2}/\d{4}\s*[-–]\s*\d{1,2}/\d{4}\b',
-            r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{4}\b',
-            r'\b\d{4}\s*[-–]\s*present\b',
-        ]
-        date_found = any(re.search(pattern, resume_text, re.IGNORECASE) for pattern in date_patterns)
-        if not date_found:
+        if not facts.has_dates:
             ats_issues.append("Employment dates not clearly formatted")
             score -= 8
 
@@ -546,6 +672,10 @@ def simple_summarize(text: str) -> str:
         return "Error generating summary"
 
 
+NOT_A_RESUME_ERROR = ("The uploaded file does not appear to be a resume. Please upload a valid resume document "
+                      "containing sections like experience, education, skills, or qualifications.")
+
+
 def validate_resume_content(text: str) -> bool:
     """Validate if the content appears to be a resume by checking for key keywords"""
     resume_keywords = ["experience", "education", "skills", "contact", "work history", "qualifications"]
@@ -558,96 +688,331 @@ def validate_resume_content(text: str) -> bool:
     return False
 
 
-def analyze_resume(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect") -> Dict[str, any]:
-    """Enhanced resume analysis function returning JSON-serializable dict"""
+# Bump when scoring logic changes in a way that should invalidate cached results
+SCORING_CONFIG_VERSION = "2"
+
+# Result cache, sized by RESUME_CACHE_SIZE; set RESUME_CACHE_PATH to a SQLite file to persist it
+analysis_cache = cache_from_env("RESUME_CACHE", default_size=1024, name="analysis_cache")
+
+
+def taxonomy_version(taxonomy: Optional[Taxonomy] = None) -> str:
+    """Version tag covering the skill taxonomy, aliases and weights"""
+    return content_hash(SCORING_CONFIG_VERSION, (taxonomy or get_taxonomy()).digest)
+
+
+def scoring_config_version() -> str:
+    """Version tag covering the skill taxonomy, weights and summarizer mode"""
+    model_ready = summarizer is not None or model_manager.is_loaded("summarizer")
+    matching = f"semantic:{semantic_matcher.threshold}" if semantic_matcher is not None else "exact"
+    summary_mode = "chunked" if chunked_summarizer is not None else "head"
+    return content_hash(taxonomy_version(), "model" if model_ready else "simple", matching, summary_mode)
+
+
+@dataclass
+class JobProfile:
+    """Everything scoring needs from a job description, built once per JD and reused across resumes.
+
+    skills starts from the detected role's taxonomy entry; taxonomy skills the JD
+    mentions that the role does not list are added as "important". confidence is
+    None when the role was chosen explicitly, in which case it is computed per resume.
+    """
+    job_id: str
+    role: Optional[str]
+    confidence: Optional[float]
+    skills: Dict[str, List[str]]
+    jd_skills: Dict[str, int] = field(default_factory=dict)
+    weights: Dict[str, int] = field(default_factory=lambda: dict(get_taxonomy().weights))
+
+    @property
+    def matcher(self) -> SkillMatcher:
+        return get_skill_matcher(skill for category in self.skills.values() for skill in category)
+
+    def to_dict(self) -> Dict[str, any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, any]) -> "JobProfile":
+        return cls(**data)
+
+
+# Registered job profiles, sized by RESUME_JOB_PROFILES_SIZE; RESUME_JOB_PROFILES_PATH persists them
+job_profiles = cache_from_env("RESUME_JOB_PROFILES", default_size=256, name="job_profiles")
+
+
+def build_job_profile(jd_text: str, target_role: str = "Auto-detect") -> JobProfile:
+    """Parse a job description once into a reusable JobProfile"""
+    if not isinstance(jd_text, str):
+        jd_text = str(jd_text) if jd_text is not None else ""
+
+    taxonomy = get_taxonomy()
+    jd_hits = count_skill_hits(jd_text, taxonomy)
+    if target_role and target_role != "Auto-detect":
+        role, confidence = target_role, None
+    else:
+        role, confidence = detect_job_role_from_text(jd_text, jd_hits, taxonomy)
+
+    skills = {category: list(skill_list) for category, skill_list in taxonomy.skills_for(role).items()}
+    known = {skill.lower() for skill_list in skills.values() for skill in skill_list}
+
+    jd_skills = {}
+    for skill in taxonomy.skills:
+        count = jd_hits.get(skill.lower(), 0)
+        if count:
+            jd_skills[skill] = count
+            if skill.lower() not in known:
+                skills.setdefault("important", []).append(skill)
+                known.add(skill.lower())
+
+    job_id = content_hash(taxonomy_version(taxonomy), target_role or "Auto-detect", jd_text)[:24]
+    return JobProfile(job_id=job_id, role=role, confidence=confidence, skills=skills, jd_skills=jd_skills,
+                      weights=dict(taxonomy.weights))
+
+
+def register_job_profile(jd_text: str, target_role: str = "Auto-detect") -> JobProfile:
+    """Build a JobProfile and store it so later analyses can refer to it by job_id"""
+    profile = build_job_profile(jd_text, target_role)
+    job_profiles.set(profile.job_id, profile.to_dict())
+    return profile
+
+
+def get_job_profile(job_id: str) -> Optional[JobProfile]:
+    data = job_profiles.get(job_id) if job_id else None
+    return JobProfile.from_dict(data) if data else None
+
+
+def analysis_cache_key(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect",
+                       job_profile: Optional[JobProfile] = None) -> str:
+    if job_profile is not None:
+        return content_hash(scoring_config_version(), "job:" + job_profile.job_id, resume_text)
+    return content_hash(scoring_config_version(), target_role or "Auto-detect", jd_text, resume_text)
+
+
+def analyze_resume_cached(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect",
+                          job_profile: Optional[JobProfile] = None, timer: Optional[StageTimer] = None,
+                          compact: bool = False) -> Tuple[Dict[str, any], bool]:
+    """analyze_resume through the result cache; also returns whether it was a cache hit"""
+    result, hit = analyze_resume_result(resume_text, jd_text, target_role, job_profile, timer)
+    return render_result(result, compact), hit
+
+
+def analyze_resume_result(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect",
+                          job_profile: Optional[JobProfile] = None,
+                          timer: Optional[StageTimer] = None) -> Tuple[Union[AnalysisResult, Dict[str, str]], bool]:
+    """Cached analysis as an AnalysisResult (or an error dict), for callers that render it themselves"""
+    result, _, hit = _analyze_resume_scored_cached(resume_text, jd_text, target_role, job_profile=job_profile,
+                                                   timer=timer)
+    return result, hit
+
+
+def _analyze_resume_scored_cached(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect",
+                                  jd_role: Optional[Tuple[Optional[str], float]] = None,
+                                  job_profile: Optional[JobProfile] = None,
+                                  timer: Optional[StageTimer] = None
+                                  ) -> Tuple[Union[AnalysisResult, Dict[str, str]], float, bool]:
+    timer = timer or StageTimer()
+    with timer.stage("cache_lookup"):
+        key = analysis_cache_key(resume_text, jd_text, target_role, job_profile)
+        cached = analysis_cache.get(key)
+    if cached is not None:
+        return AnalysisResult.from_dict(cached["result"]), cached["score"], True
+
+    result, score = _analyze_resume_scored(resume_text, jd_text, target_role, jd_role, job_profile, timer)
+    # Errors and semantic-mode fallbacks to exact matching may be transient, so only cache full analyses
+    if isinstance(result, AnalysisResult) and result.skill_matching != "exact":
+        analysis_cache.set(key, {"result": result.to_dict(), "score": score})
+    return result, score, False
+
+
+def analyze_resume(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect",
+                   jd_role: Optional[Tuple[Optional[str], float]] = None,
+                   job_profile: Optional[JobProfile] = None, compact: bool = False) -> Dict[str, any]:
+    """Enhanced resume analysis function returning JSON-serializable dict (compact: numbers, no display strings)"""
+    result, _ = _analyze_resume_scored(resume_text, jd_text, target_role, jd_role, job_profile)
+    return render_result(result, compact)
+
+
+def _analyze_resume_scored(resume_text: str, jd_text: str = "", target_role: str = "Auto-detect",
+                           jd_role: Optional[Tuple[Optional[str], float]] = None,
+                           job_profile: Optional[JobProfile] = None,
+                           timer: Optional[StageTimer] = None) -> Tuple[Union[AnalysisResult, Dict[str, str]], float]:
+    """Run the analysis: an AnalysisResult (or an error dict) and the numeric skill score (used for ranking).
+
+    jd_role is an already computed detect_job_role_from_text(jd_text) result, so
+    callers scoring many resumes against one JD only detect its role once. With a
+    job_profile, jd_text, target_role and jd_role are ignored and the resume is
+    scored against the profile's role and skills. Stage durations are recorded
+    on timer (a fresh StageTimer if none is given).
+    """
+    timer = timer or StageTimer()
+    # One taxonomy for the whole analysis, even if a new one is loaded meanwhile
+    taxonomy = get_taxonomy()
     try:
         if not resume_text or len(resume_text) < 50:
-            return {"error": "Invalid or unreadable resume."}
+            return {"error": "Invalid or unreadable resume."}, 0
 
         # Validate if content appears to be a resume
         if not validate_resume_content(resume_text):
-            return {"error": "The uploaded file does not appear to be a resume. Please upload a valid resume document containing sections like experience, education, skills, or qualifications."}
+            return {"error": NOT_A_RESUME_ERROR}, 0
+
+        # One scan per pattern in REGEX_BANK, shared by the extractors below
+        with timer.stage("facts"):
+            facts = extract_text_facts(resume_text)
+
+        with timer.stage("contact"):
+            contact_info = extract_contact_info(resume_text, facts)
+            education = extract_education(resume_text)
+
+        return score_extracted_resume(resume_text, facts, contact_info, education, jd_text=jd_text,
+                                      target_role=target_role, jd_role=jd_role, job_profile=job_profile,
+                                      taxonomy=taxonomy, timer=timer)
+
+    except Exception as e:
+        error_msg = f"Error analyzing resume: {str(e)}"
+        logger.error(error_msg)
+        print(error_msg)
+        return {"error": error_msg}, 0
+
 
-        contact_info = extract_contact_info(resume_text)
-        experience_years = extract_experience_years(resume_text)
-        education = extract_education(resume_text)
+def summary_source_key(resume_text: str) -> str:
+    """Hash of the part of the resume the model summary is written from"""
+    if chunked_summarizer is not None:
+        return content_hash("chunked", resume_text)
+    return content_hash(resume_text[:1000])
 
-        if jd_text:
-            detected_role, confidence = detect_job_role_from_text(jd_text)
+
+def summarize_resume(resume_text: str) -> Tuple[str, bool]:
+    """Summary of the resume and whether the model wrote it (False for the simple_summarize fallback)"""
+    try:
+        if chunked_summarizer is not None:
+            summary = chunked_summarizer.summarize(resume_text)
+        else:
+            summary = summary_queue.summarize(resume_text[:1000])
+        if summary is not None:
+            return summary, True
+        SUMMARY_FALLBACKS.inc(reason="unavailable")
+    except Exception as e:
+        print(f"Summarization error: {e}")
+        SUMMARY_FALLBACKS.inc(reason="error")
+    return simple_summarize(resume_text), False
+
+
+def score_extracted_resume(resume_text: str, facts: TextFacts, contact_info: Dict[str, str], education: List[str],
+                           skill_hits: Optional[Dict[str, int]] = None, summary: Optional[str] = None,
+                           jd_text: str = "", target_role: str = "Auto-detect",
+                           jd_role: Optional[Tuple[Optional[str], float]] = None,
+                           job_profile: Optional[JobProfile] = None, taxonomy: Optional[Taxonomy] = None,
+                           timer: Optional[StageTimer] = None) -> Tuple[AnalysisResult, float]:
+    """Score a resume whose facts have already been extracted and build the analysis result.
+
+    skill_hits and summary are computed from resume_text when not given, so
+    callers that keep them from an earlier analysis (see resume_sessions) skip
+    those scans.
+    """
+    timer = timer or StageTimer()
+    taxonomy = taxonomy or get_taxonomy()
+
+    semantic = None
+    with timer.stage("role_detection"):
+        # One pass over the resume gives skill counts for every role
+        if skill_hits is None:
+            skill_hits = count_skill_hits(resume_text, taxonomy)
+        if semantic_matcher is not None:
+            skill_hits, semantic = semantic_matcher.augment(resume_text, skill_hits, taxonomy)
+
+        if job_profile is not None:
+            detected_role, confidence = job_profile.role, job_profile.confidence
+            required_skills = job_profile.skills
         else:
-            detected_role, confidence = detect_job_role_from_text(resume_text)
+            if jd_role is not None:
+                detected_role, confidence = jd_role
+            elif jd_text:
+                detected_role, confidence = detect_job_role_from_text(jd_text, taxonomy=taxonomy)
+            else:
+                detected_role, confidence = detect_job_role_from_text(resume_text, skill_hits, taxonomy)
+
+            if target_role and target_role != "Auto-detect":
+                detected_role, confidence = target_role, None
+
+            required_skills = taxonomy.skills_for(detected_role)
 
-        if target_role and target_role != "Auto-detect":
-            detected_role = target_role
+    with timer.stage("skill_scoring"):
+        if confidence is None:
             # Calculate confidence based on skill match score
-            required_skills_for_confidence = ROLE_SKILLS.get(detected_role, {})
+            required_skills_for_confidence = taxonomy.roles.get(detected_role, {})
             if required_skills_for_confidence:
-                confidence_score, _, _, _ = advanced_skill_scoring(resume_text, required_skills_for_confidence)
+                confidence_score, _, _, _ = advanced_skill_scoring(resume_text, required_skills_for_confidence,
+                                                                   skill_hits, taxonomy.weights)
                 confidence = confidence_score
             else:
                 confidence = 0
 
-        if detected_role and detected_role in ROLE_SKILLS:
-            required_skills = ROLE_SKILLS[detected_role]
+        weights = job_profile.weights if job_profile is not None else taxonomy.weights
+        score, level, found_skills, skill_counts = advanced_skill_scoring(resume_text, required_skills,
+                                                                          skill_hits, weights)
+
+    with timer.stage("ats_score"):
+        ats_score, ats_issues = generate_ats_score(resume_text, facts)
+
+    if summary is None:
+        with timer.stage("summary"):
+            summary, _ = summarize_resume(resume_text)
+
+    found = set(found_skills)
+    skills = [SkillMatch(category, weight, [skill for skill in required_skills.get(category, ()) if skill in found],
+                         [skill for skill in required_skills.get(category, ()) if skill not in found])
+              for category, weight in weights.items()]
+    result = AnalysisResult(
+        summary=summary, match_score=score, level=level, role=detected_role, confidence=confidence,
+        skills=skills, mentions=skill_counts, experience_years=facts.experience_years,
+        contact=ContactInfo.from_extracted(contact_info), education=list(education), ats_score=ats_score,
+        ats_issues=ats_issues, skill_matching=None if semantic is None else ("semantic" if semantic else "exact"))
+    return result, score
+
+
+def analyze_resumes_batch(resumes: List[Tuple[str, str]], jd_text: str = "", target_role: str = "Auto-detect",
+                          max_workers: Optional[int] = None,
+                          job_profile: Optional[JobProfile] = None, compact: bool = False) -> List[Dict[str, any]]:
+    """Score many resumes against one job description and return them ranked.
+
+    resumes is a list of (resume_id, resume_text) pairs. The JD role is detected
+    once up front (or taken from job_profile) and the resumes are analyzed on a
+    thread pool. Entries are sorted by skill score (ATS score breaks ties);
+    failed analyses go last. compact returns the results without display strings.
+    """
+    jd_role = detect_job_role_from_text(jd_text) if jd_text and job_profile is None else None
+
+    def run(item):
+        resume_id, resume_text = item
+        result, score, _ = _analyze_resume_scored_cached(resume_text, jd_text, target_role, jd_role, job_profile)
+        return resume_id, result, score
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        analyzed = list(executor.map(run, resumes))
+
+    def sort_key(entry):
+        _, result, score = entry
+        if not isinstance(result, AnalysisResult):
+            return (1, 0, 0)
+        return (0, -score, -result.ats_score)
+
+    ranked = []
+    for resume_id, result, score in sorted(analyzed, key=sort_key):
+        entry = {"id": resume_id, "match_score": round(score, 1)}
+        if not isinstance(result, AnalysisResult):
+            entry["rank"] = None
         else:
-            required_skills = {
-                "core": ["Communication", "Teamwork", "Problem Solving"],
-                "important": ["Leadership", "Time Management", "Adaptability"],
-                "nice_to_have": ["Innovation", "Customer Service", "Technical Skills"]
-            }
-
-        score, level, found_skills, skill_counts = advanced_skill_scoring(resume_text, required_skills)
-        feedback = generate_detailed_feedback(score, found_skills, required_skills, contact_info, experience_years)
-        ats_score, ats_issues = generate_ats_score(resume_text)
-
-        try:
-            if summarizer:
-                summary = summarizer(resume_text[:1000], max_length=150, min_length=30, do_sample=False)[0][
-                    "summary_text"]
-            else:
-                summary = simple_summarize(resume_text)
-        except Exception as e:
-            print(f"Summarization error: {e}")
-            summary = simple_summarize(resume_text)
-
-        skill_breakdown = f"\n\n📊 Skill Analysis:\n"
-        skill_breakdown += f"• Core skills found: {len([s for s in found_skills if s in required_skills.get('core', [])])}/{len(required_skills.get('core', []))}\n"
-        skill_breakdown += f"• Important skills found: {len([s for s in found_skills if s in required_skills.get('important', [])])}/{len(required_skills.get('important', []))}\n"
-        skill_breakdown += f"• Nice-to-have skills found: {len([s for s in found_skills if s in required_skills.get('nice_to_have', [])])}/{len(required_skills.get('nice_to_have', []))}"
-
-        enhanced_feedback = feedback + skill_breakdown
-
-        return {
-            "summary": summary,
-            "score": f"{score:.1f}% ({level})",
-            "role": f"{detected_role or 'Not Detected'} (Confidence: {confidence:.1f}%)",
-            "skills": ", ".join(found_skills) if found_skills else "❌ No matching skills found",
-            "feedback": enhanced_feedback,
-            "contact": {
-                "name": contact_info.get('name', 'N/A'),
-                "email": contact_info.get('email', 'N/A'),
-                "phone": contact_info.get('phone', 'N/A'),
-                "linkedin": contact_info.get('linkedin', 'N/A')
-            },
-            "education": [f"🎓 {edu}" for edu in education] if education else ["❌ No education information found"],
-            "ats": {
-                "score": ats_score,
-                "issues": ats_issues
-            }
-        }
-
-    except Exception as e:
-        error_msg = f"Error analyzing resume: {str(e)}"
-        logger.error(error_msg)
-        print(error_msg)
-        return {"error": error_msg}
+            entry["rank"] = len(ranked) + 1
+        entry["result"] = render_result(result, compact)
+        ranked.append(entry)
+    return ranked
 
 
-# Initialize models when module is imported (optional)
-# Commented out to avoid memory issues on deployment
-# try:
-#     initialize_models()
-# except Exception as e:
-#     print(f"Warning: Could not initialize models: {e}")
-#     print("Continuing without AI models - basic functionality will work")
+if __name__ == "__main__":
+    # python -m Resume score ...
+    import sys
+    from batch_scorer import main
 
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(*parts: str) -> str:
+    """Stable sha256 key over several text parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8", errors="ignore"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Bounded in-memory LRU of JSON-serializable values with an optional SQLite backend.
+
+    Values are stored as JSON strings so every get() hands back a fresh copy and
+    the same representation can be written to disk. When db_path is set, misses
+    fall through to the SQLite file, which is shared by every process that opens
+    it (e.g. all gunicorn workers) and survives restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None,
+                 max_disk_entries: int = 100000, name: str = "cache"):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._disk_writes = 0
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "sets": 0, "evictions": 0, "errors": 0}
+
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, accessed REAL)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Could not open {name} database {db_path}: {e}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                result = "hit"
+            else:
+                raw = self._disk_get(key)
+                if raw is None:
+                    self._stats["misses"] += 1
+                    result = "miss"
+                else:
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    self._memory_set(key, raw)
+                    result = "disk_hit"
+        CACHE_LOOKUPS.inc(cache=self.name, result=result)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        raw = json.dumps(value)
+        with self._lock:
+            self._stats["sets"] += 1
+            self._memory_set(key, raw)
+            self._disk_set(key, raw)
+
+    def delete(self, key: str) -> bool:
+        """Remove key from memory and disk; returns whether it was present"""
+        with self._lock:
+            found = self._entries.pop(key, None) is not None
+            if self._db is not None:
+                try:
+                    found = self._db.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0 or found
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self._stats["errors"] += 1
+                    logger.error(f"{self.name} delete failed: {e}")
+            return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM entries")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self._stats["errors"] += 1
+                    logger.error(f"{self.name} clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+            stats["disk"] = self._db is not None
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            return stats
+
+    def _memory_set(self, key: str, raw: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = raw
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+        except sqlite3.Error as e:
+            self._stats["errors"] += 1
+            logger.error(f"{self.name} read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, raw: str) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute("INSERT OR REPLACE INTO entries (key, value, accessed) VALUES (?, ?, ?)",
+                             (key, raw, time.time()))
+            # Trim the least recently used rows every so often rather than on every write
+            self._disk_writes += 1
+            if self._disk_writes % 100 == 0:
+                self._db.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            self._stats["errors"] += 1
+            logger.error(f"{self.name} write failed: {e}")
+
+
+def cache_from_env(prefix: str, default_size: int = 1024, name: str = "cache") -> LRUCache:
+    """Build an LRUCache configured by <prefix>_SIZE and <prefix>_PATH environment variables"""
+    size = int(os.environ.get(f"{prefix}_SIZE", default_size))
+    db_path = os.environ.get(f"{prefix}_PATH") or None
+    return LRUCache(max_entries=size, db_path=db_path, name=name)
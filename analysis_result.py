@@ -0,0 +1,180 @@
+"""Structured analysis results and their JSON serialization.
+
+An analysis is kept as an AnalysisResult: numbers, skill lists per category
+and contact fields, in slotted dataclasses so thousands of results stay small
+in memory. Two JSON shapes are produced from it:
+
+- display(): the original response with formatted strings ("72.5% (Strong
+  Match)", the emoji feedback and skill breakdown) that the frontend shows
+- to_dict(): the compact format with the numbers and per-category counts as
+  plain fields, for clients that process results rather than show them
+
+The display strings are only built when display() is called. dumps() uses
+orjson when it is installed and the standard json module otherwise.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # the standard library encoder is slower but gives the same JSON
+    orjson = None
+
+NOT_FOUND = "Not found"
+NAME_NOT_FOUND = "Name not found"
+
+
+@dataclass(slots=True)
+class ContactInfo:
+    """Contact details found in a resume; None where nothing was found"""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    linkedin: Optional[str] = None
+
+    @classmethod
+    def from_extracted(cls, contact_info: Dict[str, str]) -> "ContactInfo":
+        """From an extract_contact_info() dict, whose missing values are placeholder strings"""
+        values = {key: contact_info.get(key) for key in ("name", "email", "phone", "linkedin")}
+        return cls(**{key: None if value in (NOT_FOUND, NAME_NOT_FOUND) else value for key, value in values.items()})
+
+    def display(self) -> Dict[str, str]:
+        return {"name": self.name or NAME_NOT_FOUND, "email": self.email or NOT_FOUND,
+                "phone": self.phone or NOT_FOUND, "linkedin": self.linkedin or NOT_FOUND}
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {"name": self.name, "email": self.email, "phone": self.phone, "linkedin": self.linkedin}
+
+
+@dataclass(slots=True)
+class SkillMatch:
+    """The required skills of one category, split into found and missing (both in the role's order)"""
+    category: str
+    weight: int
+    found: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def required_count(self) -> int:
+        return len(self.found) + len(self.missing)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"category": self.category, "weight": self.weight, "found_count": len(self.found),
+                "required_count": self.required_count, "found": self.found, "missing": self.missing}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SkillMatch":
+        return cls(data["category"], data["weight"], list(data["found"]), list(data["missing"]))
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """Everything analyze_resume found, as data; display() renders the formatted response"""
+    summary: str
+    match_score: float
+    level: str
+    role: Optional[str]
+    confidence: float
+    skills: List[SkillMatch]
+    # Mentions of each found skill in the resume
+    mentions: Dict[str, int]
+    experience_years: Optional[int]
+    contact: ContactInfo
+    education: List[str]
+    ats_score: int
+    ats_issues: List[str]
+    # "semantic" or "exact" when semantic skill matching is enabled, else None
+    skill_matching: Optional[str] = None
+
+    @property
+    def found_skills(self) -> List[str]:
+        return [skill for match in self.skills for skill in match.found]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact format: numbers and lists only, no display strings"""
+        data = {
+            "summary": self.summary,
+            "match_score": self.match_score,
+            "level": self.level,
+            "role": self.role,
+            "confidence": self.confidence,
+            "skills": [match.to_dict() for match in self.skills],
+            "mentions": self.mentions,
+            "experience_years": self.experience_years,
+            "contact": self.contact.to_dict(),
+            "education": self.education,
+            "ats": {"score": self.ats_score, "issues": self.ats_issues},
+        }
+        if self.skill_matching is not None:
+            data["skill_matching"] = self.skill_matching
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnalysisResult":
+        return cls(
+            summary=data["summary"], match_score=data["match_score"], level=data["level"], role=data["role"],
+            confidence=data["confidence"], skills=[SkillMatch.from_dict(match) for match in data["skills"]],
+            mentions=dict(data["mentions"]), experience_years=data["experience_years"],
+            contact=ContactInfo(**data["contact"]), education=list(data["education"]),
+            ats_score=data["ats"]["score"], ats_issues=list(data["ats"]["issues"]),
+            skill_matching=data.get("skill_matching"))
+
+    def display(self) -> Dict[str, Any]:
+        """The formatted response the frontend shows"""
+        # Imported here: Resume imports this module
+        from Resume import generate_detailed_feedback
+
+        found_skills = self.found_skills
+        required = {match.category: match.found + match.missing for match in self.skills}
+        contact = self.contact.display()
+        feedback = generate_detailed_feedback(self.match_score, found_skills, required, contact,
+                                              self.experience_years)
+
+        skill_breakdown = f"\n\n📊 Skill Analysis:\n"
+        for category, label, end in (("core", "Core", "\n"), ("important", "Important", "\n"),
+                                     ("nice_to_have", "Nice-to-have", "")):
+            category_skills = required.get(category, [])
+            found = len([skill for skill in found_skills if skill in category_skills])
+            skill_breakdown += f"• {label} skills found: {found}/{len(category_skills)}{end}"
+
+        result = {
+            "summary": self.summary,
+            "score": f"{self.match_score:.1f}% ({self.level})",
+            "role": f"{self.role or 'Not Detected'} (Confidence: {self.confidence:.1f}%)",
+            "skills": ", ".join(found_skills) if found_skills else "❌ No matching skills found",
+            "feedback": feedback + skill_breakdown,
+            "contact": contact,
+            "education": [f"🎓 {edu}" for edu in self.education] if self.education
+            else ["❌ No education information found"],
+            "ats": {
+                "score": self.ats_score,
+                "issues": self.ats_issues
+            }
+        }
+        if self.skill_matching is not None:
+            result["skill_matching"] = self.skill_matching
+        return result
+
+
+def render_result(result: Union[AnalysisResult, Dict[str, Any]], compact: bool = False) -> Dict[str, Any]:
+    """JSON-ready response for an analysis: compact or display format; error dicts are returned as they are"""
+    if not isinstance(result, AnalysisResult):
+        return result
+    return result.to_dict() if compact else result.display()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (AnalysisResult, ContactInfo, SkillMatch)):
+        return value.to_dict()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """UTF-8 JSON for a response body; result dataclasses are written in the compact format"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default,
+                           option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
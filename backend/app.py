@@ -1,13 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
-import tempfile
 import sys
 import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to import Resume.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from Resume import analyze_resume, extract_text_from_pdf, extract_text_from_docx
+from Resume import (AnalysisResult, analyze_resume_result, analyze_resumes_batch, analysis_cache, model_manager,
+                    register_job_profile, get_job_profile, get_taxonomy, semantic_matcher, taxonomy_store)
+from analysis_cache import cache_from_env
+from analysis_result import dumps, render_result
+from candidate_store import CandidateStore
+from coalescing import coalescer_from_env
+from document_pool import DocumentParseError
+from job_queue import LANES, job_queue_from_env
+from metrics import StageTimer, render_metrics
+from resume_sessions import SessionStore
+from uploads import (ALLOWED_EXTENSIONS, analysis_request_key, document_pool, extract_upload_text, file_digest,
+                     read_upload)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -15,6 +27,135 @@ CORS(app)  # Enable CORS for all routes
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# With gunicorn preload_app this runs once in the master, so workers share the weights copy-on-write
+if os.environ.get('RESUME_MODELS', 'lazy').lower() == 'preload':
+    model_manager.warm(block=True)
+    if semantic_matcher is not None:
+        model_manager.warm(['embedder'], block=True)
+
+MAX_BATCH_FILES = 5000
+
+CANDIDATE_DB_PATH = os.environ.get('RESUME_CANDIDATE_DB', 'candidates.db')
+# Incremental analysis sessions, sized by RESUME_SESSIONS_SIZE; RESUME_SESSIONS_PATH shares them across workers
+session_store = SessionStore(cache_from_env('RESUME_SESSIONS', default_size=1000, name='sessions'))
+# Concurrent identical /analyze_resume requests run once; RESUME_COALESCE_WINDOW keeps results for retries
+request_coalescer = coalescer_from_env()
+_candidate_store = None
+
+
+def get_candidate_store():
+    """Open the candidate store on first use"""
+    global _candidate_store
+    if _candidate_store is None:
+        _candidate_store = CandidateStore(CANDIDATE_DB_PATH)
+    return _candidate_store
+
+
+def iter_batch_uploads(files):
+    """Yield (name, ext, bytes) for every resume in the upload, expanding zip archives"""
+    for upload in files:
+        if not upload or not upload.filename:
+            continue
+        ext = os.path.splitext(upload.filename)[1].lower()
+        if ext == '.zip':
+            with zipfile.ZipFile(upload.stream) as archive:
+                for info in archive.infolist():
+                    member_ext = os.path.splitext(info.filename)[1].lower()
+                    if info.is_dir() or member_ext not in ALLOWED_EXTENSIONS:
+                        continue
+                    yield info.filename, member_ext, archive.read(info)
+        elif ext in ALLOWED_EXTENSIONS:
+            yield upload.filename, ext, upload.read()
+
+def parse_uploads(uploads):
+    """Parse (name, ext, bytes) uploads concurrently; yields (name, text, error) in order"""
+    def parse(upload):
+        name, ext, data = upload
+        try:
+            text = extract_upload_text(data, ext)
+        except DocumentParseError as e:
+            return name, None, e.to_dict()
+        if not text or text.startswith("Error"):
+            return name, None, {"error": "Failed to extract text from resume"}
+        return name, text, None
+
+    # Keep every parsing process busy
+    parse_workers = document_pool.max_workers if document_pool else 1
+    with ThreadPoolExecutor(max_workers=parse_workers) as executor:
+        yield from executor.map(parse, uploads)
+
+
+def read_batch_uploads(files):
+    """Collect the (name, ext, bytes) uploads of a batch request; raises ValueError when there are too many"""
+    uploads = []
+    for upload in iter_batch_uploads(files):
+        if len(uploads) >= MAX_BATCH_FILES:
+            raise ValueError(f"Too many resumes (max {MAX_BATCH_FILES})")
+        uploads.append(upload)
+    return uploads
+
+def wants_timings():
+    """Whether the client asked for the per-stage timings block"""
+    value = request.args.get('timings') or request.form.get('timings') or ''
+    return value.lower() in ('1', 'true', 'yes')
+
+def wants_compact():
+    """Whether the client asked for the compact result format (numbers, no display strings)"""
+    value = request.args.get('format') or request.form.get('format') or ''
+    return value.lower() == 'compact'
+
+def json_response(payload, status=200):
+    """JSON response serialized with analysis_result.dumps (orjson when installed)"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def run_resume_analysis(resume_data, resume_ext, jd_data, jd_ext, target_role, job_profile, timer,
+                        resume_digest=None, jd_digest=None):
+    """Parse and analyze one /analyze_resume upload; returns (AnalysisResult or error dict, status, cache hit)"""
+    # Extract text from resume (digests are the uploads' sha256, for the extracted-text cache)
+    resume_text = extract_upload_text(resume_data, resume_ext, timer, digest=resume_digest)
+
+    if not resume_text or resume_text.startswith("Error"):
+        return {"error": "Failed to extract text from resume"}, 400, False
+
+    # Extract JD text if provided (a registered job profile replaces it)
+    jd_text = ""
+    if jd_data is not None:
+        jd_text = extract_upload_text(jd_data, jd_ext, timer, stage='extract_jd', digest=jd_digest)
+
+    # Analyze resume
+    result, cache_hit = analyze_resume_result(resume_text, jd_text, target_role, job_profile, timer)
+    return result, 200 if isinstance(result, AnalysisResult) else 400, cache_hit
+
+def run_analysis_job(params, files):
+    """Job handler for POST /jobs/analyze: the same analysis as /analyze_resume, run by a queue worker"""
+    job_profile = None
+    if params.get('job_id'):
+        job_profile = get_job_profile(params['job_id'])
+        if job_profile is None:
+            return {"error": f"Unknown job_id: {params['job_id']}"}, 404
+
+    resume_ext = params['resume_ext']
+    timer = StageTimer(resume_ext)
+    try:
+        resume_digest = file_digest(files['resume'])
+        jd_digest = file_digest(files['jd']) if 'jd' in files else None
+        key = analysis_request_key(resume_digest, resume_ext, jd_digest, params.get('jd_ext'),
+                                   params['target_role'], params.get('job_id'))
+        (result, status, _), _ = request_coalescer.run(
+            key, run_resume_analysis, files['resume'], resume_ext, files.get('jd'), params.get('jd_ext'),
+            params['target_role'], job_profile, timer, resume_digest, jd_digest)
+    except DocumentParseError as e:
+        # A document that cannot be parsed will not parse on a retry either
+        return e.to_dict(), 422
+    return render_result(result, params.get('compact', False)), status
+
+# Background analyses for POST /jobs/analyze, configured by RESUME_JOBS_PATH / RESUME_JOB_WORKERS / ...
+job_queue = job_queue_from_env({'analyze': run_analysis_job})
+
+@app.before_request
+def resume_pending_jobs():
+    job_queue.resume_pending()
+
 @app.route('/analyze_resume', methods=['POST'])
 def analyze_resume_endpoint():
     try:
@@ -25,69 +166,327 @@ def analyze_resume_endpoint():
         resume_file = request.files['resume']
         jd_file = request.files.get('jd')  # Optional JD file
         target_role = request.form.get('target_role', 'Auto-detect')
+        job_id = request.args.get('job_id') or request.form.get('job_id')  # Optional registered JD
 
         if not resume_file.filename:
             return jsonify({"error": "No resume file selected"}), 400
 
+        job_profile = None
+        if job_id:
+            job_profile = get_job_profile(job_id)
+            if job_profile is None:
+                return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+
         # Validate file extension
-        allowed_extensions = {'.pdf', '.docx', '.txt'}
         resume_ext = os.path.splitext(resume_file.filename)[1].lower()
-        if resume_ext not in allowed_extensions:
+        if resume_ext not in ALLOWED_EXTENSIONS:
             return jsonify({"error": "Unsupported file type. Please upload PDF, DOCX, or TXT files."}), 400
 
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=resume_ext) as temp_resume:
-            resume_file.save(temp_resume.name)
-            temp_resume_path = temp_resume.name
+        has_jd = job_profile is None and jd_file and jd_file.filename
+        jd_ext = os.path.splitext(jd_file.filename)[1].lower() if has_jd else None
+        if has_jd and jd_ext not in ALLOWED_EXTENSIONS:
+            return jsonify({"error": "Unsupported JD file type"}), 400
 
-        try:
-            # Extract text from resume
-            if resume_ext == '.pdf':
-                resume_text = extract_text_from_pdf(temp_resume_path)
-            elif resume_ext == '.docx':
-                resume_text = extract_text_from_docx(temp_resume_path)
-            elif resume_ext == '.txt':
-                with open(temp_resume_path, 'r', encoding='utf-8') as f:
-                    resume_text = f.read()
-
-            if not resume_text or resume_text.startswith("Error"):
-                return jsonify({"error": "Failed to extract text from resume"}), 400
-
-            # Extract JD text if provided
-            jd_text = ""
-            if jd_file and jd_file.filename:
-                jd_ext = os.path.splitext(jd_file.filename)[1].lower()
-                if jd_ext not in allowed_extensions:
-                    return jsonify({"error": "Unsupported JD file type"}), 400
-
-                with tempfile.NamedTemporaryFile(delete=False, suffix=jd_ext) as temp_jd:
-                    jd_file.save(temp_jd.name)
-                    if jd_ext == '.pdf':
-                        jd_text = extract_text_from_pdf(temp_jd.name)
-                    elif jd_ext == '.docx':
-                        jd_text = extract_text_from_docx(temp_jd.name)
-                    os.unlink(temp_jd.name)
-
-            # Analyze resume
-            result = analyze_resume(resume_text, jd_text, target_role)
-
-            if "error" in result:
-                return jsonify(result), 400
-
-            return jsonify(result)
-
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_resume_path):
-                os.unlink(temp_resume_path)
+        # Per-stage timings feed /metrics and, with ?timings=1, the response
+        timer = StageTimer(resume_ext)
+
+        # The uploads are hashed as they are read: the digests key both coalescing and the text cache
+        with timer.stage('upload'):
+            resume_data, resume_digest = read_upload(resume_file)
+            jd_data, jd_digest = read_upload(jd_file) if has_jd else (None, None)
+
+        # Identical requests already running or just answered share that result
+        key = analysis_request_key(resume_digest, resume_ext, jd_digest, jd_ext, target_role, job_id)
+        (result, status, cache_hit), source = request_coalescer.run(
+            key, run_resume_analysis, resume_data, resume_ext, jd_data, jd_ext, target_role, job_profile, timer,
+            resume_digest, jd_digest)
+
+        if status != 200:
+            return jsonify(result), status
+
+        # Display strings are only built for the default format
+        result = render_result(result, wants_compact())
+        if wants_timings():
+            result = {**result, "timings": timer.as_dict()}
 
+        response = json_response(result)
+        response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+        if source != 'leader':
+            response.headers['X-Coalesced'] = source
+        return response
+
+    except DocumentParseError as e:
+        logger.warning(f"Document parsing failed in analyze_resume_endpoint: {e.message}")
+        return jsonify(e.to_dict()), 422
     except Exception as e:
         logger.error(f"Error in analyze_resume_endpoint: {str(e)}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+@app.route('/analyze_batch', methods=['POST'])
+def analyze_batch_endpoint():
+    try:
+        resume_files = request.files.getlist('resumes')
+        if not resume_files:
+            return jsonify({"error": "No resume files provided"}), 400
+
+        jd_file = request.files.get('jd')  # Optional JD file
+        target_role = request.form.get('target_role', 'Auto-detect')
+        job_id = request.args.get('job_id') or request.form.get('job_id')  # Optional registered JD
+
+        job_profile = None
+        if job_id:
+            job_profile = get_job_profile(job_id)
+            if job_profile is None:
+                return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+
+        jd_text = ""
+        if job_profile is None and jd_file and jd_file.filename:
+            jd_ext = os.path.splitext(jd_file.filename)[1].lower()
+            if jd_ext not in ALLOWED_EXTENSIONS:
+                return jsonify({"error": "Unsupported JD file type"}), 400
+            jd_text = extract_upload_text(jd_file.stream, jd_ext)
+
+        try:
+            uploads = read_batch_uploads(resume_files)
+        except zipfile.BadZipFile:
+            return jsonify({"error": "Invalid zip archive"}), 400
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        resumes = []
+        failed = []
+        for name, text, error in parse_uploads(uploads):
+            if error:
+                failed.append({"id": name, "match_score": 0, "rank": None, "result": error})
+            else:
+                resumes.append((name, text))
+
+        if not resumes and not failed:
+            return jsonify({"error": "No supported resume files found. Please upload PDF, DOCX, TXT or ZIP files."}), 400
+
+        results = analyze_resumes_batch(resumes, jd_text, target_role, job_profile=job_profile,
+                                        compact=wants_compact()) + failed
+        return json_response({"count": len(results), "results": results})
+
+    except DocumentParseError as e:
+        logger.warning(f"JD parsing failed in analyze_batch_endpoint: {e.message}")
+        return jsonify(e.to_dict()), 422
+    except Exception as e:
+        logger.error(f"Error in analyze_batch_endpoint: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/sessions/<document_id>', methods=['POST'])
+def update_session_endpoint(document_id):
+    try:
+        data = request.get_json(silent=True) or {}
+        sections = data.get('sections')
+        if not isinstance(sections, dict) or not all(text is None or isinstance(text, str)
+                                                     for text in sections.values()):
+            return jsonify({"error": "sections must map section names to text (or null to remove one)"}), 400
+        order = data.get('order')
+        if order is not None and not isinstance(order, list):
+            return jsonify({"error": "order must be a list of section names"}), 400
+
+        job_profile = None
+        job_id = data.get('job_id')
+        if job_id:
+            job_profile = get_job_profile(job_id)
+            if job_profile is None:
+                return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+
+        timer = StageTimer('session')
+        result, reanalyzed = session_store.update(document_id, sections, order, data.get('jd_text'),
+                                                  data.get('target_role'), job_profile, timer,
+                                                  compact=wants_compact() or data.get('format') == 'compact')
+
+        if "error" in result:
+            return jsonify({**result, "document_id": document_id}), 400
+
+        result = {**result, "document_id": document_id, "reanalyzed_sections": reanalyzed}
+        if wants_timings():
+            result["timings"] = timer.as_dict()
+        return jsonify(result)
+
+    except Exception as e:
+        logger.error(f"Error in update_session_endpoint: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/sessions/<document_id>', methods=['DELETE'])
+def delete_session_endpoint(document_id):
+    if not session_store.delete(document_id):
+        return jsonify({"error": f"Unknown session: {document_id}"}), 404
+    return '', 204
+
+@app.route('/jobs', methods=['POST'])
+def create_job_endpoint():
+    try:
+        jd_file = request.files.get('jd')
+        target_role = request.form.get('target_role', 'Auto-detect')
+
+        if jd_file and jd_file.filename:
+            jd_ext = os.path.splitext(jd_file.filename)[1].lower()
+            if jd_ext not in ALLOWED_EXTENSIONS:
+                return jsonify({"error": "Unsupported JD file type"}), 400
+            jd_text = extract_upload_text(jd_file.stream, jd_ext)
+        else:
+            jd_text = request.form.get('jd_text', '')
+
+        if not jd_text.strip() or jd_text.startswith("Error"):
+            return jsonify({"error": "No readable job description provided"}), 400
+
+        profile = register_job_profile(jd_text, target_role)
+        return jsonify(profile.to_dict()), 201
+
+    except DocumentParseError as e:
+        logger.warning(f"JD parsing failed in create_job_endpoint: {e.message}")
+        return jsonify(e.to_dict()), 422
+    except Exception as e:
+        logger.error(f"Error in create_job_endpoint: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/jobs/analyze', methods=['POST'])
+def submit_analysis_jobs_endpoint():
+    try:
+        target_role = request.form.get('target_role', 'Auto-detect')
+        job_id = request.args.get('job_id') or request.form.get('job_id')
+        callback_url = request.form.get('callback_url') or None
+        if job_id and get_job_profile(job_id) is None:
+            return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+        if callback_url:
+            job_queue.check_callback_url(callback_url)
+
+        resume_file = request.files.get('resume')
+        if resume_file and resume_file.filename:
+            # A single upload: someone is waiting for it, so it goes ahead of bulk imports
+            resume_ext = os.path.splitext(resume_file.filename)[1].lower()
+            if resume_ext not in ALLOWED_EXTENSIONS:
+                return jsonify({"error": "Unsupported file type. Please upload PDF, DOCX, or TXT files."}), 400
+            jd_file = request.files.get('jd')
+            has_jd = not job_id and jd_file and jd_file.filename
+            jd_ext = os.path.splitext(jd_file.filename)[1].lower() if has_jd else None
+            if has_jd and jd_ext not in ALLOWED_EXTENSIONS:
+                return jsonify({"error": "Unsupported JD file type"}), 400
+            uploads = [(resume_file.filename, resume_ext, resume_file.read())]
+            jd_data = jd_file.read() if has_jd else None
+            lane = request.form.get('lane', 'interactive')
+        else:
+            # Many resumes (or zip archives) at once: one bulk job per resume
+            resume_files = request.files.getlist('resumes')
+            if not resume_files:
+                return jsonify({"error": "No resume file provided"}), 400
+            try:
+                uploads = read_batch_uploads(resume_files)
+            except zipfile.BadZipFile:
+                return jsonify({"error": "Invalid zip archive"}), 400
+            jd_data = jd_ext = None
+            lane = request.form.get('lane', 'bulk')
+
+        if lane not in LANES:
+            return jsonify({"error": f"Unknown lane: {lane}"}), 400
+
+        jobs = []
+        for name, ext, data in uploads:
+            files = {'resume': data}
+            if jd_data is not None:
+                files['jd'] = jd_data
+            params = {'resume_ext': ext, 'jd_ext': jd_ext, 'target_role': target_role, 'job_id': job_id,
+                      'filename': name, 'compact': wants_compact()}
+            queued_id = job_queue.submit('analyze', params, files, lane=lane, callback_url=callback_url)
+            jobs.append({"id": name, "job_id": queued_id, "status_url": f"/jobs/{queued_id}"})
+
+        if resume_file and resume_file.filename:
+            return jsonify({**jobs[0], "status": "queued", "lane": lane}), 202
+        return jsonify({"count": len(jobs), "lane": lane, "jobs": jobs}), 202
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in submit_analysis_jobs_endpoint: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_analysis_job_endpoint(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/profile', methods=['GET'])
+def get_job_profile_endpoint(job_id):
+    profile = get_job_profile(job_id)
+    if profile is None:
+        return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+    return jsonify(profile.to_dict())
+
+@app.route('/candidates', methods=['POST'])
+def add_candidates_endpoint():
+    try:
+        resume_files = request.files.getlist('resumes')
+        if not resume_files:
+            return jsonify({"error": "No resume files provided"}), 400
+
+        try:
+            uploads = read_batch_uploads(resume_files)
+        except zipfile.BadZipFile:
+            return jsonify({"error": "Invalid zip archive"}), 400
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        store = get_candidate_store()
+        added = []
+        failed = []
+        for name, text, error in parse_uploads(uploads):
+            if error:
+                failed.append({"id": name, **error})
+            else:
+                added.append({"id": name, "candidate_id": store.add(text, source=name)})
+
+        return jsonify({"added": added, "failed": failed, "total_candidates": store.count()})
+
+    except Exception as e:
+        logger.error(f"Error in add_candidates_endpoint: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/candidates/search', methods=['GET'])
+def search_candidates_endpoint():
+    try:
+        job_id = request.args.get('job_id')
+        role = request.args.get('role')
+        top_k = min(int(request.args.get('top_k', 20)), 1000)
+
+        store = get_candidate_store()
+        taxonomy = get_taxonomy()
+        if job_id:
+            job_profile = get_job_profile(job_id)
+            if job_profile is None:
+                return jsonify({"error": f"Unknown job_id: {job_id}"}), 404
+            results = store.query_profile(job_profile, top_k)
+        elif role in taxonomy.roles:
+            results = store.query(taxonomy.roles[role], taxonomy.weights, top_k)
+        else:
+            return jsonify({"error": "Provide a registered job_id or a known role"}), 400
+
+        return jsonify({"count": len(results), "results": results})
+
+    except ValueError:
+        return jsonify({"error": "top_k must be an integer"}), 400
+    except Exception as e:
+        logger.error(f"Error in search_candidates_endpoint: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(analysis_cache.stats())
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "Resume Analyzer API is running"})
+    return jsonify({"status": "healthy", "message": "Resume Analyzer API is running",
+                    "models": model_manager.status(), "taxonomy": taxonomy_store.status()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,187 @@
+"""Asynchronous (ASGI) entry point exposing the same /analyze_resume, /health and /metrics API as app.py.
+
+Uploads are received without blocking the event loop, the resume and JD are parsed
+concurrently, and at most RESUME_MAX_IN_FLIGHT analyses run at once; further requests
+get 503 with a Retry-After header instead of queueing behind slow ones.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Resume import AnalysisResult, analyze_resume_result, get_job_profile, model_manager, taxonomy_store
+from analysis_result import dumps, render_result
+from coalescing import coalescer_from_env
+from document_pool import DocumentParseError
+from metrics import StageTimer, render_metrics
+from uploads import ALLOWED_EXTENSIONS, analysis_request_key, extract_upload_text, file_extension
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_IN_FLIGHT = int(os.environ.get('RESUME_MAX_IN_FLIGHT', 16))
+RETRY_AFTER_SECONDS = int(os.environ.get('RESUME_RETRY_AFTER', 5))
+
+in_flight = 0
+
+# Concurrent identical /analyze_resume requests run once; RESUME_COALESCE_WINDOW keeps results for retries
+request_coalescer = coalescer_from_env()
+
+
+async def read_upload(upload, chunk_size=1 << 16):
+    """(bytes, sha256 hex digest) of an uploaded file, hashed chunk by chunk as it is received"""
+    digest = hashlib.sha256()
+    chunks = []
+    while chunk := await upload.read(chunk_size):
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+
+async def parse_upload(data, ext, timer, stage='extract', digest=None):
+    """Parse uploaded bytes on a worker thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, extract_upload_text, data, ext, timer, stage, digest)
+
+
+async def run_resume_analysis(resume_data, resume_ext, jd_data, jd_ext, target_role, job_profile, timer,
+                              resume_digest=None, jd_digest=None):
+    """Parse and analyze one /analyze_resume upload; returns (AnalysisResult or error dict, status, cache hit)"""
+    # Parse the resume and the JD at the same time
+    if jd_data is not None:
+        resume_text, jd_text = await asyncio.gather(
+            parse_upload(resume_data, resume_ext, timer, digest=resume_digest),
+            parse_upload(jd_data, jd_ext, timer, 'extract_jd', jd_digest))
+    else:
+        resume_text, jd_text = await parse_upload(resume_data, resume_ext, timer, digest=resume_digest), ""
+
+    if not resume_text or resume_text.startswith("Error"):
+        return {"error": "Failed to extract text from resume"}, 400, False
+
+    loop = asyncio.get_running_loop()
+    result, cache_hit = await loop.run_in_executor(None, analyze_resume_result, resume_text, jd_text,
+                                                   target_role, job_profile, timer)
+    return result, 200 if isinstance(result, AnalysisResult) else 400, cache_hit
+
+
+def settle(key, future, task):
+    """Done callback handing a leader's outcome to the requests coalesced onto it"""
+    if task.cancelled():
+        request_coalescer.fail(key, future, asyncio.CancelledError())
+    elif task.exception() is not None:
+        request_coalescer.fail(key, future, task.exception())
+    else:
+        request_coalescer.complete(key, future, task.result())
+
+
+async def analyze_resume_endpoint(request):
+    global in_flight
+    # Shed load instead of letting requests pile up behind slow analyses
+    if in_flight >= MAX_IN_FLIGHT:
+        return JSONResponse({"error": "Server is busy, please retry shortly"}, status_code=503,
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    in_flight += 1
+    try:
+        form = await request.form()
+        resume_file = form.get('resume')
+        jd_file = form.get('jd')  # Optional JD file
+        target_role = form.get('target_role') or 'Auto-detect'
+        job_id = request.query_params.get('job_id') or form.get('job_id')  # Optional registered JD
+
+        if resume_file is None or isinstance(resume_file, str):
+            return JSONResponse({"error": "No resume file provided"}, status_code=400)
+
+        job_profile = None
+        if job_id:
+            job_profile = get_job_profile(job_id)
+            if job_profile is None:
+                return JSONResponse({"error": f"Unknown job_id: {job_id}"}, status_code=404)
+            jd_file = None
+
+        if not resume_file.filename:
+            return JSONResponse({"error": "No resume file selected"}, status_code=400)
+
+        resume_ext = file_extension(resume_file.filename)
+        if resume_ext not in ALLOWED_EXTENSIONS:
+            return JSONResponse({"error": "Unsupported file type. Please upload PDF, DOCX, or TXT files."},
+                                status_code=400)
+
+        has_jd = jd_file is not None and not isinstance(jd_file, str) and jd_file.filename
+        jd_ext = file_extension(jd_file.filename) if has_jd else None
+        if has_jd and jd_ext not in ALLOWED_EXTENSIONS:
+            return JSONResponse({"error": "Unsupported JD file type"}, status_code=400)
+
+        # Per-stage timings feed /metrics and, with ?timings=1, the response
+        timer = StageTimer(resume_ext)
+
+        # Receive the uploads without blocking the loop, hashing them for coalescing and the text cache
+        with timer.stage('upload', resume_ext):
+            resume_data, resume_digest = await read_upload(resume_file)
+            jd_data, jd_digest = await read_upload(jd_file) if has_jd else (None, None)
+
+        # Identical requests already running or just answered share that result. The analysis runs as
+        # its own task so a leader whose client disconnects still finishes it for the others.
+        key = analysis_request_key(resume_digest, resume_ext, jd_digest, jd_ext, target_role, job_id)
+        future, source = request_coalescer.claim(key)
+        if source == 'leader':
+            task = asyncio.ensure_future(run_resume_analysis(resume_data, resume_ext, jd_data, jd_ext,
+                                                             target_role, job_profile, timer, resume_digest,
+                                                             jd_digest))
+            task.add_done_callback(lambda done: settle(key, future, done))
+        result, status, cache_hit = await asyncio.shield(asyncio.wrap_future(future))
+
+        if status != 200:
+            return JSONResponse(result, status_code=status)
+
+        # Display strings are only built for the default format
+        response_format = request.query_params.get('format') or form.get('format') or ''
+        result = render_result(result, response_format.lower() == 'compact')
+        timings = request.query_params.get('timings') or form.get('timings') or ''
+        if timings.lower() in ('1', 'true', 'yes'):
+            result = {**result, "timings": timer.as_dict()}
+
+        headers = {"X-Cache": "HIT" if cache_hit else "MISS"}
+        if source != 'leader':
+            headers["X-Coalesced"] = source
+        return Response(dumps(result), media_type='application/json', headers=headers)
+
+    except DocumentParseError as e:
+        logger.warning(f"Document parsing failed in analyze_resume_endpoint: {e.message}")
+        return JSONResponse(e.to_dict(), status_code=422)
+    except Exception as e:
+        logger.error(f"Error in analyze_resume_endpoint: {str(e)}")
+        return JSONResponse({"error": f"Internal server error: {str(e)}"}, status_code=500)
+    finally:
+        in_flight -= 1
+
+
+async def health_check(request):
+    return JSONResponse({"status": "healthy", "message": "Resume Analyzer API is running",
+                         "models": model_manager.status(), "taxonomy": taxonomy_store.status(),
+                         "in_flight": in_flight})
+
+
+async def metrics_endpoint(request):
+    body, content_type = render_metrics()
+    return Response(body, headers={"Content-Type": content_type})
+
+
+app = Starlette(
+    routes=[
+        Route('/analyze_resume', analyze_resume_endpoint, methods=['POST']),
+        Route('/health', health_check, methods=['GET']),
+        Route('/metrics', metrics_endpoint, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+)
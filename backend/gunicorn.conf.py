@@ -0,0 +1,9 @@
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+timeout = 120
+
+# RESUME_MODELS=preload loads the models once in the master before forking,
+# so every worker shares the same weights copy-on-write
+preload_app = os.environ.get("RESUME_MODELS", "lazy").lower() == "preload"
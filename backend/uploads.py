@@ -0,0 +1,77 @@
+import hashlib
+import os
+import sys
+
+# Add parent directory to path to import Resume.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Resume import extract_text, scoring_config_version
+from analysis_cache import content_hash
+from document_pool import DocumentParseError, pool_from_env
+from metrics import EXTRACTION_ERRORS, StageTimer
+from text_cache import read_hashed, text_cache_from_env
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
+
+# Scoring only needs the first pages; later pages of long portfolios are not parsed
+MAX_PDF_PAGES = int(os.environ.get('RESUME_MAX_PDF_PAGES', 10)) or None
+
+# PDF/DOCX parsing runs in a process pool with a hard timeout (RESUME_PARSE_WORKERS=0 parses inline)
+document_pool = pool_from_env()
+
+# Extracted PDF/DOCX text by file hash, shared by the workers (RESUME_TEXT_CACHE_SIZE / _PATH / _ENTRIES)
+text_cache = text_cache_from_env()
+
+
+def file_extension(filename):
+    return os.path.splitext(filename or '')[1].lower()
+
+
+def read_upload(upload):
+    """(bytes, sha256 hex digest) of an uploaded file, hashed while it is read"""
+    return read_hashed(upload.stream)
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def analysis_request_key(resume_digest, resume_ext, jd_digest=None, jd_ext=None, target_role='Auto-detect',
+                         job_id=None):
+    """Identity of an /analyze_resume request: the uploads' sha256 digests, role, job and scoring configuration"""
+    return content_hash(scoring_config_version(), resume_digest, resume_ext, jd_digest or '', jd_ext or '',
+                        target_role or 'Auto-detect', job_id or '')
+
+
+def extract_upload_text(source, ext, timer=None, stage='extract', digest=None):
+    """Extract text straight from an upload stream or bytes, without a temporary file.
+
+    PDF and DOCX text is looked up in text_cache by the file's sha256 (digest,
+    if the caller already hashed the bytes) before anything is parsed. The
+    time taken is recorded as `stage` on timer. Raises DocumentParseError if
+    the parser times out or crashes.
+    """
+    timer = timer or StageTimer(ext)
+    data = source
+    if not isinstance(source, (bytes, bytearray)):
+        with timer.stage('upload', ext):
+            data, digest = read_hashed(source)
+    use_cache = text_cache is not None and ext != '.txt'
+    try:
+        with timer.stage(stage, ext):
+            if use_cache:
+                digest = digest or file_digest(data)
+                cached = text_cache.get(digest, ext, MAX_PDF_PAGES)
+                if cached is not None:
+                    return cached["text"]
+            if document_pool is None or ext == '.txt':
+                text = extract_text(data, ext, max_pages=MAX_PDF_PAGES)
+            else:
+                text = document_pool.extract(data, ext, max_pages=MAX_PDF_PAGES)
+    except DocumentParseError as e:
+        EXTRACTION_ERRORS.inc(file_type=ext.lstrip('.'), code=e.code)
+        raise
+    if not text or text.startswith(("Error", "Unsupported")):
+        EXTRACTION_ERRORS.inc(file_type=ext.lstrip('.'), code='no_text')
+    elif use_cache:
+        text_cache.set(digest, ext, MAX_PDF_PAGES, text)
+    return text
@@ -0,0 +1,280 @@
+"""Offline bulk scoring of a directory or zip of resumes.
+
+    python -m Resume score --jd jd.pdf --role "Data Analyst" resumes/ -o scores.jsonl
+    python -m Resume score --jd jd.pdf resumes.zip -o scores.csv --resume
+
+Files are read lazily and parsed and analyzed in a process pool with a bounded
+number of documents in flight, and each result is written as soon as it is
+ready, so memory stays flat however large the pool is. Every record carries the
+sha256 of the file it came from; --resume reads those back from the output file
+and skips files (and duplicate copies) that were already scored.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+import Resume
+from analysis_result import render_result
+from document_pool import _limit_worker_memory
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+CSV_FIELDS = ["file", "sha256", "match_score", "score", "role", "ats_score", "name", "email", "phone", "skills",
+              "error", "code"]
+
+# Set in each worker by _init_worker so the JD is sent once per process, not per file
+_job = {}
+
+
+def iter_documents(path: str) -> Iterator[Tuple[str, str, bytes]]:
+    """Lazily yield (name, ext, bytes) for every supported file in a directory tree or zip archive"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                ext = os.path.splitext(info.filename)[1].lower()
+                if not info.is_dir() and ext in SUPPORTED_EXTENSIONS:
+                    yield info.filename, ext, archive.read(info)
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for filename in sorted(files):
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in SUPPORTED_EXTENSIONS:
+                continue
+            file_path = os.path.join(root, filename)
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            except OSError as e:
+                logger.error(f"Could not read {file_path}: {e}")
+                continue
+            yield os.path.relpath(file_path, path), ext, data
+
+
+def _init_worker(jd_text: str, target_role: str, jd_role, max_pages: Optional[int], use_models: bool,
+                 max_memory_mb: int, compact: bool = False) -> None:
+    _limit_worker_memory(max_memory_mb)
+    if not use_models:
+        Resume.model_manager.enabled = False
+    _job.update(jd_text=jd_text, target_role=target_role, jd_role=jd_role, max_pages=max_pages, compact=compact)
+
+
+def _score_document(name: str, ext: str, data: bytes, digest: str) -> Dict[str, Any]:
+    """Worker: extract and analyze one document into an output record"""
+    record = {"file": name, "sha256": digest}
+    try:
+        text = Resume.extract_text(data, ext, _job["max_pages"])
+        if not text or text.startswith(("Error", "Unsupported")):
+            record["error"] = "Failed to extract text from resume"
+            return record
+        result, score = Resume._analyze_resume_scored(text, _job["jd_text"], _job["target_role"], _job["jd_role"])
+    except MemoryError:
+        record.update(error="Document parser ran out of memory", code="parse_memory")
+        return record
+
+    if not isinstance(result, Resume.AnalysisResult):
+        record["error"] = result["error"]
+    else:
+        record.update({"match_score": round(score, 1), "ats_score": result.ats_score,
+                       "result": render_result(result, _job["compact"])})
+    return record
+
+
+def _csv_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    result = record.get("result", {})
+    contact = result.get("contact", {})
+    return {
+        "file": record["file"],
+        "sha256": record["sha256"],
+        "match_score": record.get("match_score", ""),
+        "score": result.get("score", ""),
+        "role": result.get("role", ""),
+        "ats_score": record.get("ats_score", ""),
+        "name": contact.get("name", ""),
+        "email": contact.get("email", ""),
+        "phone": contact.get("phone", ""),
+        "skills": result.get("skills", ""),
+        "error": record.get("error", ""),
+        "code": record.get("code", ""),
+    }
+
+
+class ResultWriter:
+    """Appends one JSONL line or CSV row per record and flushes it, so an interrupted run loses nothing"""
+
+    def __init__(self, path: Optional[str], fmt: str, append: bool = False):
+        self.fmt = fmt
+        self._file = open(path, "a" if append else "w", newline="", encoding="utf-8") if path else sys.stdout
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if not (append and self._file.tell()):
+                self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._csv is not None:
+            self._csv.writerow(_csv_row(record))
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+def load_checkpoint(path: str, fmt: str) -> Set[str]:
+    """Hashes of the files already scored in an earlier run's output.
+
+    Files whose worker crashed are left out so they are tried again, and a
+    partially written last line is dropped.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+
+    done = set()
+    lines = data[:end].decode("utf-8", errors="ignore").splitlines()
+    if fmt == "csv":
+        records = list(csv.DictReader(lines))
+    else:
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return {record["sha256"] for record in records
+            if isinstance(record, dict) and record.get("sha256") and record.get("code") != "parse_crashed"}
+
+
+def score_path(path: str, writer: ResultWriter, jd_text: str = "", target_role: str = "Auto-detect",
+               done: Optional[Set[str]] = None, workers: Optional[int] = None, max_pages: Optional[int] = None,
+               use_models: bool = False, max_memory_mb: int = 512, compact: bool = False) -> Dict[str, int]:
+    """Score every resume under path, writing records as they finish; returns counts"""
+    done = set(done or ())
+    workers = workers or os.cpu_count() or 1
+    jd_role = Resume.detect_job_role_from_text(jd_text) if jd_text else None
+    initargs = (jd_text, target_role, jd_role, max_pages, use_models, max_memory_mb, compact)
+    counts = {"scored": 0, "failed": 0, "skipped": 0}
+
+    def new_executor():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+
+    def submit(name, ext, data, digest, attempt=0):
+        future = executor.submit(_score_document, name, ext, data, digest)
+        pending[future] = (name, ext, data, digest, executor, attempt)
+
+    def collect(finished):
+        nonlocal executor
+        retries = []
+        for future in finished:
+            name, ext, data, digest, submitted_to, attempt = pending.pop(future)
+            try:
+                record = future.result()
+            except BrokenProcessPool:
+                # Every document in flight on a dead pool fails with it: retry each once on a fresh pool
+                if submitted_to is executor:
+                    logger.warning("Scoring worker crashed; restarting the process pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_executor()
+                if not attempt:
+                    retries.append((name, ext, data, digest, 1))
+                    continue
+                record = {"file": name, "sha256": digest, "error": "Document parser crashed or ran out of memory",
+                          "code": "parse_crashed"}
+            writer.write(record)
+            counts["failed" if "error" in record else "scored"] += 1
+        for retry in retries:
+            submit(*retry)
+
+    executor = new_executor()
+    pending = {}
+    try:
+        for name, ext, data in iter_documents(path):
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in done:
+                counts["skipped"] += 1
+                continue
+            done.add(digest)
+
+            # Keep a bounded window of documents in flight
+            while len(pending) >= workers * 2:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            submit(name, ext, data, digest)
+
+        while pending:
+            collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m Resume", description="Resume Analyzer command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="Score a directory or zip of resumes against a job description")
+    score.add_argument("path", help="Directory (searched recursively) or zip archive of PDF, DOCX and TXT resumes")
+    score.add_argument("--jd", help="Job description file (PDF, DOCX or TXT)")
+    score.add_argument("--role", default="Auto-detect", help="Target role (default: detect from the JD or resume)")
+    score.add_argument("-o", "--output", help="Output file (default: stdout)")
+    score.add_argument("--format", choices=["jsonl", "csv"], help="Output format (default: from the output "
+                                                                   "file extension, else jsonl)")
+    score.add_argument("--resume", action="store_true", help="Continue an interrupted run, skipping files "
+                                                             "already in the output")
+    score.add_argument("--workers", type=int, help="Parsing processes (default: CPU count)")
+    score.add_argument("--max-pages", type=int, default=10, help="Only parse the first N PDF pages (0 = all)")
+    score.add_argument("--summaries", action="store_true", help="Use the transformers summarizer in every "
+                                                                "worker instead of the rule-based summary")
+    score.add_argument("--compact", action="store_true", help="Write results in the compact format (numbers "
+                                                               "and skill lists, no display strings; JSONL only)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    roles = Resume.get_taxonomy().roles
+    if args.role != "Auto-detect" and args.role not in roles:
+        parser.error(f"Unknown role {args.role!r}; choose from {', '.join(roles)}")
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    fmt = args.format or ("csv" if (args.output or "").lower().endswith(".csv") else "jsonl")
+    if args.compact and fmt == "csv":
+        parser.error("--compact only applies to jsonl output")
+
+    jd_text = ""
+    if args.jd:
+        jd_text = Resume.extract_text(args.jd, os.path.splitext(args.jd)[1])
+        if not jd_text or jd_text.startswith(("Error", "Unsupported")):
+            parser.error(f"Could not read the job description: {jd_text}")
+
+    done = load_checkpoint(args.output, fmt) if args.resume else set()
+    writer = ResultWriter(args.output, fmt, append=args.resume)
+    try:
+        counts = score_path(args.path, writer, jd_text, args.role, done, args.workers, args.max_pages or None,
+                            args.summaries, compact=args.compact)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; rerun with --resume to continue")
+        return 130
+    finally:
+        writer.close()
+
+    logger.info(f"Scored {counts['scored']}, failed {counts['failed']}, skipped {counts['skipped']} already scored")
+    return 0
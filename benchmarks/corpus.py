@@ -0,0 +1,183 @@
+"""Synthetic resume and job description generator for the benchmarks.
+
+Documents are built from the skill taxonomy in Resume.py so role detection and
+skill scoring have realistic work to do. Length (pages) and skill density (the
+share of a role's skills mentioned) are controllable, and each document can be
+written as TXT, DOCX or PDF. PDFs are written by a small built-in writer so no
+extra dependency is needed.
+"""
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Resume import ROLE_SKILLS
+
+LINES_PER_PAGE = 45
+
+FIRST_NAMES = ["Aisha", "Carlos", "Mei", "John", "Priya", "Lukas", "Fatima", "Noah", "Sofia", "Kenji"]
+LAST_NAMES = ["Khan", "Garcia", "Chen", "Doe", "Sharma", "Muller", "Hassan", "Smith", "Rossi", "Tanaka"]
+COMPANIES = ["Tech Corp", "Startup Inc", "Global Retail", "DataWorks", "CloudNine", "FinServe", "HealthPlus"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Business Administration",
+           "B.Tech in Information Technology", "M.Sc in Statistics", "Bachelor of Arts in Marketing"]
+FILLER = [
+    "Delivered projects on schedule while coordinating with cross-functional teams",
+    "Improved process efficiency by {pct}% through automation and better tooling",
+    "Mentored junior colleagues and ran weekly knowledge sharing sessions",
+    "Worked closely with stakeholders to gather requirements and define scope",
+    "Owned production support rotation and reduced incident count by {pct}%",
+    "Presented quarterly results to senior leadership",
+]
+FORMATS = ("txt", "docx", "pdf")
+
+
+def _skills_for(role: str, density: float, rng: random.Random) -> List[str]:
+    skills = [skill for category in ROLE_SKILLS[role].values() for skill in category]
+    count = max(1, round(len(skills) * density))
+    return rng.sample(skills, min(count, len(skills)))
+
+
+def make_resume(rng: random.Random, role: Optional[str] = None, pages: int = 1, skill_density: float = 0.5) -> str:
+    """Plain-text resume of roughly `pages` pages for the given (or a random) role"""
+    role = role or rng.choice(list(ROLE_SKILLS))
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = _skills_for(role, skill_density, rng)
+    handle = name.lower().replace(" ", ".")
+
+    lines = [
+        name,
+        role,
+        f"Email: {handle}@example.com",
+        f"Phone: ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        f"linkedin.com/in/{handle.replace('.', '-')}",
+        "",
+        "Professional Summary:",
+        f"{role} with {rng.randint(1, 15)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "Skills:",
+        ", ".join(skills),
+        "",
+        "Experience:",
+    ]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE - 4:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{role} at {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(rng.randint(3, 6)):
+            sentence = rng.choice(FILLER).format(pct=rng.randint(5, 60))
+            if rng.random() < skill_density:
+                sentence += f" using {rng.choice(skills)}"
+            lines.append(f"- {sentence}")
+        lines.append("")
+        year = start
+    lines += ["Education:", rng.choice(DEGREES), f"University of Technology, {year - 1}"]
+    return "\n".join(lines)
+
+
+def make_jd(rng: random.Random, role: Optional[str] = None, skill_density: float = 0.7) -> str:
+    """Plain-text job description for the given (or a random) role"""
+    role = role or rng.choice(list(ROLE_SKILLS))
+    skills = _skills_for(role, skill_density, rng)
+    return "\n".join([
+        f"Job Title: {role}",
+        f"{rng.choice(COMPANIES)} is hiring a {role} to join our growing team.",
+        "",
+        "Requirements:",
+        *[f"- Experience with {skill}" for skill in skills],
+        "",
+        "We offer competitive pay, remote work and a learning budget.",
+    ])
+
+
+def write_txt(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path: str, text: str) -> None:
+    import docx
+
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", errors="replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, text: str, lines_per_page: int = LINES_PER_PAGE) -> None:
+    """Minimal text-only PDF writer (Helvetica, one text block per page)"""
+    lines = text.split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 14 TL 50 780 Td\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines) + "ET"
+        objects.append(f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream")
+        content_ref = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>")
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate_corpus(out_dir: str, count: int = 100, formats=FORMATS, pages: int = 1,
+                    skill_density: float = 0.5, seed: int = 0) -> Dict[str, List[Dict[str, str]]]:
+    """Write `count` resumes (cycling through formats), one JD per role and manifest.json; returns the manifest"""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {"resumes": [], "jds": []}
+
+    for i in range(count):
+        fmt = formats[i % len(formats)]
+        role = rng.choice(list(ROLE_SKILLS))
+        path = os.path.join(out_dir, f"resume_{i:05d}.{fmt}")
+        WRITERS[fmt](path, make_resume(rng, role, pages, skill_density))
+        manifest["resumes"].append({"path": path, "format": fmt, "role": role})
+
+    for i, role in enumerate(ROLE_SKILLS):
+        path = os.path.join(out_dir, f"jd_{i:02d}.txt")
+        write_txt(path, make_jd(rng, role))
+        manifest["jds"].append({"path": path, "format": "txt", "role": role})
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--formats", default="txt,docx,pdf")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--skill-density", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = generate_corpus(args.out_dir, args.count, args.formats.split(","), args.pages, args.skill_density,
+                             args.seed)
+    print(f"Wrote {len(result['resumes'])} resumes and {len(result['jds'])} job descriptions to {args.out_dir}")
@@ -0,0 +1,189 @@
+"""Per-stage timing of the analysis pipeline over a synthetic corpus.
+
+    python benchmarks/run_benchmarks.py --count 300 --save baseline.json
+    python benchmarks/run_benchmarks.py --count 300 --compare baseline.json
+
+Each document goes through the same steps as analyze_resume, timed one stage at
+a time, followed by one uncached end-to-end analyze_resume call. The report has
+p50/p95/p99/mean milliseconds per stage and docs/sec. --compare exits non-zero
+when any stage's p50 or p95 regressed by more than --threshold percent.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Resume import (ROLE_SKILLS, _analyze_resume_scored, advanced_skill_scoring, count_skill_hits,
+                    detect_job_role_from_text, extract_contact_info, extract_text, extract_text_facts,
+                    generate_ats_score, simple_summarize, summary_queue)
+from corpus import FORMATS, generate_corpus
+
+STAGES = ["extract", "facts", "contact", "role_detection", "skill_scoring", "ats_score", "summary", "pipeline",
+          "analyze_resume"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize_timings(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """p50/p95/p99/mean in milliseconds for every stage"""
+    report = {}
+    for stage, values in samples.items():
+        values = sorted(values)
+        report[stage] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        }
+    return report
+
+
+def detect_role(text: str, jd_text: str):
+    """The skill scan shared by role detection and scoring, plus the role itself"""
+    skill_hits = count_skill_hits(text)
+    role, _ = detect_job_role_from_text(jd_text) if jd_text else detect_job_role_from_text(text, skill_hits)
+    return skill_hits, role
+
+
+def time_document(path: str, ext: str, jd_text: str, samples: Dict[str, List[float]]) -> None:
+    """Run one document through every stage, appending each stage's duration in seconds"""
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        value = func(*args)
+        samples[stage].append(time.perf_counter() - start)
+        return value
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    text = timed("extract", extract_text, data, f".{ext}")
+    samples[f"extract.{ext}"].append(samples["extract"][-1])
+    if text.startswith(("Error", "Unsupported")):
+        raise RuntimeError(f"Could not extract {path}: {text}")
+
+    facts = timed("facts", extract_text_facts, text)
+    timed("contact", extract_contact_info, text, facts)
+    skill_hits, role = timed("role_detection", detect_role, text, jd_text)
+    timed("skill_scoring", advanced_skill_scoring, text, ROLE_SKILLS.get(role, {}), skill_hits)
+    timed("ats_score", generate_ats_score, text, facts)
+    timed("summary", lambda t: summary_queue.summarize(t[:1000]) or simple_summarize(t), text)
+    samples["pipeline"].append(time.perf_counter() - start)
+
+    timed("analyze_resume", _analyze_resume_scored, text, jd_text)
+
+
+def run(corpus_dir: str, jd_role: str = None) -> Dict[str, object]:
+    with open(os.path.join(corpus_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    jd_text = ""
+    if jd_role:
+        jd = next(entry for entry in manifest["jds"] if entry["role"] == jd_role)
+        with open(jd["path"], encoding="utf-8") as f:
+            jd_text = f.read()
+
+    samples = defaultdict(list)
+    start = time.perf_counter()
+    for entry in manifest["resumes"]:
+        time_document(entry["path"], entry["format"], jd_text, samples)
+    elapsed = time.perf_counter() - start
+
+    ordered = {stage: samples[stage] for stage in STAGES + sorted(set(samples) - set(STAGES)) if samples[stage]}
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "documents": len(manifest["resumes"]),
+            "jd_role": jd_role,
+        },
+        "stages": summarize_timings(ordered),
+        "docs_per_sec": round(len(manifest["resumes"]) / elapsed, 2) if elapsed else 0.0,
+        "pipeline_docs_per_sec": round(len(samples["pipeline"]) / sum(samples["pipeline"]), 2)
+        if samples["pipeline"] else 0.0,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[str]:
+    """Stages whose p50 or p95 grew by more than threshold percent over the baseline"""
+    regressions = []
+    for stage, stats in current["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if old[key] > 0 and (stats[key] - old[key]) / old[key] * 100 > threshold:
+                regressions.append(f"{stage} {key}: {old[key]:.3f} -> {stats[key]:.3f}")
+    return regressions
+
+
+def print_report(report: Dict[str, object], baseline: Dict[str, object] = None) -> None:
+    print(f"{'stage':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'Δp50':>9}")
+    for stage, stats in report["stages"].items():
+        delta = ""
+        old = (baseline or {}).get("stages", {}).get(stage)
+        if old and old["p50_ms"]:
+            delta = f"{(stats['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100:+.1f}%"
+        print(f"{stage:<16}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+              f"{stats['mean_ms']:>10.3f}{delta:>9}")
+    print(f"\n{report['meta']['documents']} documents, {report['docs_per_sec']} docs/sec overall, "
+          f"{report['pipeline_docs_per_sec']} docs/sec through the pipeline stages")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the resume analysis pipeline")
+    parser.add_argument("--corpus", help="Existing corpus directory (generated into a temp dir if omitted)")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--skill-density", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jd-role", choices=list(ROLE_SKILLS), help="Score against this role's synthetic JD")
+    parser.add_argument("--save", help="Write the report as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus or tmp
+        if not os.path.exists(os.path.join(corpus_dir, "manifest.json")):
+            generate_corpus(corpus_dir, args.count, args.formats.split(","), args.pages, args.skill_density,
+                            args.seed)
+        report = run(corpus_dir, args.jd_role)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions over {args.threshold:g}%:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
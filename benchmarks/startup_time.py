@@ -0,0 +1,90 @@
+"""Cold-start import time of the analysis modules.
+
+    python benchmarks/startup_time.py                 # import Resume
+    python benchmarks/startup_time.py --max-ms 100 --detail
+    python benchmarks/startup_time.py --module bulk_scoring --allow-heavy
+
+Each sample imports the module in a fresh interpreter and subtracts the time an
+empty interpreter takes to start. The report also lists heavy dependencies that
+the import pulled in and, with --detail, the slowest imports from -X importtime.
+Exits non-zero when the median exceeds --max-ms or, unless --allow-heavy is
+given, when a heavy dependency was loaded.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the rule-based scoring path must not import
+HEAVY_MODULES = ["transformers", "torch", "nltk", "pandas", "numpy", "PyPDF2", "docx"]
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True,
+                          check=True)
+
+
+def time_import(code: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_python(code)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def loaded_heavy_modules(module: str) -> list:
+    output = run_python(f"import sys, {module}; print(' '.join(sorted(sys.modules)))").stdout.split()
+    return [name for name in HEAVY_MODULES if name in output]
+
+
+def slowest_imports(module: str, limit: int = 10) -> list:
+    """(cumulative ms, module) pairs from -X importtime, slowest first"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]) / 1000, parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time")
+    parser.add_argument("--module", default="Resume")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="Fail when the median import time exceeds this")
+    parser.add_argument("--allow-heavy", action="store_true", help="Do not fail when heavy modules are imported")
+    parser.add_argument("--detail", action="store_true", help="Show the slowest imports")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first sample does not include compilation
+    run_python(f"import {args.module}")
+
+    baseline = statistics.median(time_import("pass", args.runs))
+    samples = sorted(ms - baseline for ms in time_import(f"import {args.module}", args.runs))
+    median = statistics.median(samples)
+    heavy = loaded_heavy_modules(args.module)
+
+    print(f"import {args.module}: median {median:.1f} ms, min {samples[0]:.1f} ms, max {samples[-1]:.1f} ms "
+          f"({args.runs} runs, interpreter start {baseline:.1f} ms excluded)")
+    print(f"heavy modules loaded: {', '.join(heavy) if heavy else 'none'}")
+    if args.detail:
+        for ms, name in slowest_imports(args.module):
+            print(f"  {ms:8.1f} ms  {name}")
+
+    failed = bool(heavy) and not args.allow_heavy
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"Import time over budget of {args.max_ms:g} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
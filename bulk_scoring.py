@@ -0,0 +1,126 @@
+"""Vectorized scoring of many candidates against every role at once.
+
+Skill counts for the whole corpus go into one candidate x skill matrix (built
+in a single pass per document, or straight from the candidate store's index).
+Every role's weighted match percentage for every candidate is then a single
+matrix product with the core=3 / important=2 / nice_to_have=1 weight vectors,
+using the same formula and level buckets as advanced_skill_scoring.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Resume import LEVEL_THRESHOLDS, _taxonomy_terms, count_skill_hits, get_taxonomy
+
+try:
+    from scipy import sparse
+except ImportError:  # dense matrices work too, just with more memory
+    sparse = None
+
+def skill_columns() -> List[str]:
+    """Lowercase taxonomy terms, one matrix column each"""
+    return sorted({term.lower() for term in _taxonomy_terms()})
+
+
+def _build_matrix(rows: List[int], cols: List[int], values: List[int], shape: Tuple[int, int]):
+    if sparse is not None:
+        return sparse.csr_matrix((np.asarray(values, dtype=np.int32), (rows, cols)), shape=shape)
+    matrix = np.zeros(shape, dtype=np.int32)
+    np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), values)
+    return matrix
+
+
+def skill_count_matrix(texts: Iterable[str], columns: Optional[Sequence[str]] = None):
+    """Candidate x skill count matrix for a corpus, one matcher pass per document"""
+    columns = list(columns or skill_columns())
+    column_index = {term: i for i, term in enumerate(columns)}
+    rows, cols, values = [], [], []
+    n_rows = 0
+    for row, text in enumerate(texts):
+        n_rows = row + 1
+        for term, count in count_skill_hits(text).items():
+            col = column_index.get(term)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+                values.append(count)
+    return _build_matrix(rows, cols, values, (n_rows, len(columns))), columns
+
+
+def skill_matrix_from_postings(postings: Iterable[Tuple[int, str, int]],
+                               columns: Optional[Sequence[str]] = None):
+    """Candidate x skill count matrix from (candidate_id, term, tf) postings; returns (matrix, ids, columns)"""
+    columns = list(columns or skill_columns())
+    column_index = {term: i for i, term in enumerate(columns)}
+    row_index = {}
+    rows, cols, values = [], [], []
+    for candidate_id, term, tf in postings:
+        col = column_index.get(term)
+        if col is None:
+            continue
+        rows.append(row_index.setdefault(candidate_id, len(row_index)))
+        cols.append(col)
+        values.append(tf)
+    return _build_matrix(rows, cols, values, (len(row_index), len(columns))), list(row_index), columns
+
+
+def role_weight_matrix(columns: Sequence[str], roles: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                       weights: Optional[Dict[str, int]] = None) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Skill x role weight matrix, the maximum achievable score per role, and the role names"""
+    taxonomy = get_taxonomy()
+    roles = roles or {**taxonomy.roles, "General": taxonomy.default_skills}
+    weights = weights or taxonomy.weights
+    column_index = {term: i for i, term in enumerate(columns)}
+    role_names = list(roles)
+    matrix = np.zeros((len(columns), len(role_names)), dtype=np.float64)
+    totals = np.zeros(len(role_names), dtype=np.float64)
+    for j, role in enumerate(role_names):
+        for category, weight in weights.items():
+            for skill in roles[role].get(category, []):
+                totals[j] += weight
+                i = column_index.get(skill.lower())
+                if i is not None:
+                    matrix[i, j] += weight
+    return matrix, totals, role_names
+
+
+def match_levels(scores: np.ndarray) -> np.ndarray:
+    """Vectorized match_level()"""
+    conditions = [scores >= threshold for threshold, _ in LEVEL_THRESHOLDS]
+    return np.select(conditions, [label for _, label in LEVEL_THRESHOLDS], default="Needs Improvement")
+
+
+def score_matrix(counts, ids: Sequence, columns: Sequence[str],
+                 roles: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 weights: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+    """Weighted match percentage of every candidate for every role (candidates x roles)"""
+    weight_matrix, totals, role_names = role_weight_matrix(columns, roles, weights)
+    presence = (counts > 0).astype(np.float64)
+    raw = np.asarray(presence @ weight_matrix)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(totals > 0, raw / totals * 100, 0.0)
+    return pd.DataFrame(np.minimum(scores, 100), index=pd.Index(list(ids), name="candidate"), columns=role_names)
+
+
+def rank_candidates(scores: pd.DataFrame) -> pd.DataFrame:
+    """Tidy (candidate, role, score, level, rank) table; rank is per role, best first"""
+    tidy = scores.stack().rename("score").reset_index()
+    tidy.columns = ["candidate", "role", "score"]
+    tidy["level"] = match_levels(tidy["score"].to_numpy())
+    tidy["rank"] = tidy.groupby("role")["score"].rank(method="first", ascending=False).astype(int)
+    return tidy.sort_values(["role", "rank"], ignore_index=True)
+
+
+def score_corpus(texts: Sequence[str], ids: Optional[Sequence] = None,
+                 roles: Optional[Dict[str, Dict[str, List[str]]]] = None) -> pd.DataFrame:
+    """Score every text against every role; returns the rank_candidates() table"""
+    counts, columns = skill_count_matrix(texts)
+    ids = list(ids) if ids is not None else list(range(counts.shape[0]))
+    return rank_candidates(score_matrix(counts, ids, columns, roles))
+
+
+def score_candidate_store(store, roles: Optional[Dict[str, Dict[str, List[str]]]] = None) -> pd.DataFrame:
+    """Score the whole CandidateStore pool against every role from its index, without touching the texts"""
+    counts, ids, columns = skill_matrix_from_postings(store.iter_postings())
+    return rank_candidates(score_matrix(counts, ids, columns, roles))
@@ -0,0 +1,168 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from analysis_cache import content_hash
+from Resume import (JobProfile, count_skill_hits, extract_contact_info, extract_education,
+                    extract_text_facts, get_taxonomy, match_level, taxonomy_version)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT UNIQUE NOT NULL,
+    source TEXT,
+    text TEXT NOT NULL,
+    facts TEXT NOT NULL,
+    added REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_candidate ON postings (candidate_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class CandidateStore:
+    """Persistent pool of parsed resumes with an inverted index from skill terms to candidates.
+
+    Each resume is parsed once when it is added: its text, contact details,
+    education and years of experience are stored, and every taxonomy term it
+    mentions is posted with its term frequency. Ranking the pool for a job then
+    runs the advanced_skill_scoring weights as a single index query instead of
+    re-parsing every document.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def add(self, text: str, source: Optional[str] = None) -> int:
+        """Parse and index a resume; returns its candidate id (existing id for duplicate text)"""
+        digest = content_hash(text)
+        with self._lock:
+            row = self._db.execute("SELECT id FROM candidates WHERE content_hash = ?", (digest,)).fetchone()
+        if row:
+            return row[0]
+
+        facts = extract_text_facts(text)
+        record = {
+            "contact": extract_contact_info(text, facts),
+            "education": extract_education(text),
+            "experience_years": facts.experience_years,
+        }
+        hits = count_skill_hits(text)
+
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO candidates (content_hash, source, text, facts, added) VALUES (?, ?, ?, ?, ?)",
+                (digest, source, text, json.dumps(record), time.time()))
+            if not cursor.rowcount:
+                # Added concurrently by another caller
+                return self._db.execute("SELECT id FROM candidates WHERE content_hash = ?", (digest,)).fetchone()[0]
+            candidate_id = cursor.lastrowid
+            self._db.executemany("INSERT INTO postings (term, candidate_id, tf) VALUES (?, ?, ?)",
+                                 [(term, candidate_id, tf) for term, tf in hits.items()])
+            self._set_meta("taxonomy_version", taxonomy_version())
+            self._db.commit()
+        return candidate_id
+
+    def get(self, candidate_id: int, include_text: bool = False) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT id, source, facts, text FROM candidates WHERE id = ?",
+                                   (candidate_id,)).fetchone()
+        if row is None:
+            return None
+        candidate = {"candidate_id": row[0], "source": row[1], **json.loads(row[2])}
+        if include_text:
+            candidate["text"] = row[3]
+        return candidate
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def query(self, required_skills: Dict[str, List[str]], weights: Optional[Dict[str, int]] = None,
+              top_k: int = 20) -> List[Dict[str, Any]]:
+        """Top-K candidates by the advanced_skill_scoring weighted match percentage"""
+        weights = weights or get_taxonomy().weights
+        term_weights = {}
+        total_possible_score = 0
+        for category, weight in weights.items():
+            for skill in required_skills.get(category, []):
+                total_possible_score += weight
+                term = skill.lower()
+                term_weights[term] = term_weights.get(term, 0) + weight
+        if not term_weights or total_possible_score <= 0:
+            return []
+
+        values = ", ".join("(?, ?)" for _ in term_weights)
+        params = [item for pair in term_weights.items() for item in pair]
+        sql = (f"WITH q(term, weight) AS (VALUES {values}) "
+               "SELECT p.candidate_id, SUM(q.weight) AS score, SUM(p.tf) AS mentions, GROUP_CONCAT(p.term, '|') "
+               "FROM q JOIN postings p ON p.term = q.term "
+               "GROUP BY p.candidate_id ORDER BY score DESC, mentions DESC LIMIT ?")
+        with self._lock:
+            rows = self._db.execute(sql, params + [top_k]).fetchall()
+
+        canonical = {skill.lower(): skill for category in weights for skill in required_skills.get(category, [])}
+        results = []
+        for candidate_id, score, mentions, terms in rows:
+            percentage = min(100, score / total_possible_score * 100)
+            candidate = self.get(candidate_id) or {"candidate_id": candidate_id}
+            candidate.update({
+                "match_score": round(percentage, 1),
+                "level": match_level(percentage),
+                "found_skills": [canonical[term] for term in terms.split("|")],
+                "rank": len(results) + 1,
+            })
+            results.append(candidate)
+        return results
+
+    def query_profile(self, job_profile: JobProfile, top_k: int = 20) -> List[Dict[str, Any]]:
+        return self.query(job_profile.skills, job_profile.weights, top_k)
+
+    def iter_postings(self) -> Iterator[Tuple[int, str, int]]:
+        """Every (candidate_id, term, tf) posting, e.g. for bulk_scoring"""
+        with self._lock:
+            rows = self._db.execute("SELECT candidate_id, term, tf FROM postings ORDER BY candidate_id").fetchall()
+        return iter(rows)
+
+    def reindex(self) -> int:
+        """Rebuild every posting list, e.g. after the skill taxonomy changed; returns candidates indexed"""
+        with self._lock:
+            rows = self._db.execute("SELECT id, text FROM candidates").fetchall()
+        postings = []
+        for candidate_id, text in rows:
+            postings.extend((term, candidate_id, tf) for term, tf in count_skill_hits(text).items())
+        with self._lock:
+            self._db.execute("DELETE FROM postings")
+            self._db.executemany("INSERT INTO postings (term, candidate_id, tf) VALUES (?, ?, ?)", postings)
+            self._set_meta("taxonomy_version", taxonomy_version())
+            self._db.commit()
+        return len(rows)
+
+    def is_stale(self) -> bool:
+        """Whether the index was built with a different skill taxonomy than the current one"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'taxonomy_version'").fetchone()
+        return row is not None and row[0] != taxonomy_version()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
@@ -0,0 +1,141 @@
+import os
+import re
+import time
+from typing import List, Optional
+
+from analysis_cache import LRUCache, cache_from_env, content_hash
+from summary_queue import SummaryBatcher
+
+SECTION_KEYWORDS = re.compile(
+    r"(professional\s+|career\s+|technical\s+|work\s+)?(summary|profile|objective|experience|history|employment|"
+    r"education|skills|projects|certifications?|awards|achievements|publications|languages|interests|"
+    r"volunteering|references)\s*:?",
+    re.IGNORECASE)
+
+
+def is_heading(line: str) -> bool:
+    """Whether a line looks like a resume section heading"""
+    line = line.strip()
+    if not line or len(line) > 40:
+        return False
+    return SECTION_KEYWORDS.fullmatch(line) is not None or (line.isupper() and len(line.split()) <= 4)
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text before every heading line"""
+    sections, current = [], []
+    for line in text.splitlines():
+        if is_heading(line) and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return [section for section in sections if section.strip()]
+
+
+def _split_long(section: str, max_chars: int) -> List[str]:
+    """Pieces of one section no longer than max_chars, cut at line ends and else at spaces"""
+    pieces, current = [], ""
+    for line in section.splitlines():
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        if current and len(current) + 1 + len(line) > max_chars:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def section_chunks(text: str, max_chars: int = 1000) -> List[str]:
+    """Section-aware chunks of at most max_chars: whole sections packed together, long ones split at lines"""
+    chunks, current = [], ""
+    for section in split_sections(text):
+        for piece in ([section] if len(section) <= max_chars else _split_long(section, max_chars)):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ChunkedSummarizer:
+    """Map-reduce summaries of whole resumes on top of a SummaryBatcher.
+
+    The text is split into section-aware chunks (at most max_chunks of them,
+    from the start), every chunk is summarized in the same batches, and the
+    partial summaries are summarized once more into the final summary. Chunk
+    and final summaries are cached by content hash, so an edited resume only
+    re-summarizes the chunks that changed plus the final step. The whole
+    summary gets budget_ms; chunks that miss it are left out, and if the final
+    step misses it the partial summaries are returned joined.
+    """
+
+    def __init__(self, batcher: SummaryBatcher, cache: LRUCache, chunk_chars: int = 1000, max_chunks: int = 8,
+                 budget_ms: float = 3000):
+        self.batcher = batcher
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self.max_chunks = max_chunks
+        self.budget_ms = budget_ms
+
+    def summarize(self, text: str) -> Optional[str]:
+        """Summary of the whole text, or None if the model is unavailable or no chunk made the budget"""
+        deadline = time.monotonic() + self.budget_ms / 1000
+        chunks = section_chunks(text, self.chunk_chars)[:self.max_chunks]
+        if not chunks:
+            return None
+
+        partials = [summary for summary in self._summarize_all(chunks, deadline) if summary]
+        if not partials:
+            return None
+        if len(partials) == 1:
+            return partials[0]
+
+        combined = "\n".join(partials)
+        final = self._summarize_all([combined[:self.chunk_chars * 2]], deadline)[0]
+        return final or " ".join(partials)
+
+    def _summarize_all(self, texts: List[str], deadline: float) -> List[Optional[str]]:
+        keys = [content_hash("chunk", text) for text in texts]
+        summaries = [self.cache.get(key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms > 0:
+                fresh = self.batcher.summarize_many([texts[i] for i in missing], remaining_ms)
+                for i, summary in zip(missing, fresh):
+                    if summary is not None:
+                        summaries[i] = summary
+                        self.cache.set(keys[i], summary)
+        return summaries
+
+
+def chunked_from_env(batcher: SummaryBatcher) -> Optional[ChunkedSummarizer]:
+    """ChunkedSummarizer when RESUME_SUMMARY_MODE is "chunked", else None (summarize the first 1000 characters).
+
+    RESUME_SUMMARY_CHUNK_CHARS: maximum chunk length (default 1000).
+    RESUME_SUMMARY_MAX_CHUNKS: chunks summarized per resume (default 8).
+    RESUME_SUMMARY_BUDGET_MS: total time for the whole summary (default 3000).
+    RESUME_SUMMARY_CACHE_SIZE / RESUME_SUMMARY_CACHE_PATH: the chunk summary cache.
+    """
+    if os.environ.get("RESUME_SUMMARY_MODE", "head").lower() != "chunked":
+        return None
+    return ChunkedSummarizer(
+        batcher,
+        cache_from_env("RESUME_SUMMARY_CACHE", default_size=4096, name="summary_chunks"),
+        chunk_chars=int(os.environ.get("RESUME_SUMMARY_CHUNK_CHARS", 1000)),
+        max_chunks=int(os.environ.get("RESUME_SUMMARY_MAX_CHUNKS", 8)),
+        budget_ms=float(os.environ.get("RESUME_SUMMARY_BUDGET_MS", 3000)))
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+from metrics import COALESCED_REQUESTS
+
+
+class RequestCoalescer:
+    """Runs identical concurrent requests once and hands every caller the same result.
+
+    The first caller for a key becomes the leader and computes the result;
+    callers arriving while it runs get the leader's Future instead of starting
+    their own computation. A completed result is kept for window_seconds so
+    retries right after it (double clicks, webhook redelivery) are answered
+    from it too. Failures are passed to the waiting callers but not kept.
+
+    Futures are concurrent.futures ones, so threads wait with result() and
+    asyncio code with asyncio.wrap_future().
+    """
+
+    def __init__(self, window_seconds: float = 10.0, max_entries: int = 256, name: str = "analyze_resume"):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.name = name
+        self._in_flight: Dict[str, Future] = {}
+        self._recent = OrderedDict()  # key -> (expiry, future)
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> Tuple[Future, str]:
+        """Future for key and how it was found: "leader" (caller must complete or fail it), "in_flight" or "recent" """
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    source, future = "recent", entry[1]
+                else:
+                    del self._recent[key]
+                    entry = None
+            if entry is None:
+                future = self._in_flight.get(key)
+                if future is not None:
+                    source = "in_flight"
+                else:
+                    source, future = "leader", Future()
+                    # A running future cannot be cancelled by one of the callers waiting on it
+                    future.set_running_or_notify_cancel()
+                    self._in_flight[key] = future
+        COALESCED_REQUESTS.inc(endpoint=self.name, result=source)
+        return future, source
+
+    def complete(self, key: str, future: Future, result: Any) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if self.window_seconds > 0 and self.max_entries > 0:
+                self._recent[key] = (time.monotonic() + self.window_seconds, future)
+                self._recent.move_to_end(key)
+                while len(self._recent) > self.max_entries:
+                    self._recent.popitem(last=False)
+        future.set_result(result)
+
+    def fail(self, key: str, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+
+    def run(self, key: str, fn: Callable[..., Any], *args: Any) -> Tuple[Any, str]:
+        """Call fn(*args) unless an identical call is running or just finished; returns (result, source)"""
+        future, source = self.claim(key)
+        if source == "leader":
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                self.fail(key, future, e)
+                raise
+            self.complete(key, future, result)
+        return future.result(), source
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._in_flight), "recent": len(self._recent),
+                    "window_seconds": self.window_seconds}
+
+
+def coalescer_from_env(name: str = "analyze_resume") -> RequestCoalescer:
+    """RequestCoalescer whose completed-result window is RESUME_COALESCE_WINDOW seconds (0 keeps none)"""
+    return RequestCoalescer(window_seconds=float(os.environ.get("RESUME_COALESCE_WINDOW", 10)),
+                            max_entries=int(os.environ.get("RESUME_COALESCE_ENTRIES", 256)), name=name)
@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from Resume import extract_text
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentParseError(Exception):
+    """A document could not be parsed within the pool's time or memory limits"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"error": self.message, "code": self.code}
+
+
+def _current_address_space() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _limit_worker_memory(max_memory_mb: int) -> None:
+    """Pool initializer: cap how much more memory a parsing worker may allocate"""
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+
+        # Forked workers inherit the parent's mappings, so the cap is on top of them
+        limit = _current_address_space() + max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not limit parser memory: {e}")
+
+
+class DocumentPool:
+    """Parses documents in a bounded process pool with a hard per-document timeout.
+
+    PyPDF2 is pure Python and CPU-bound, so parsing in worker processes keeps the
+    request threads free and uses every core. A document that exceeds the timeout
+    gets the whole pool killed and replaced, since a running worker cannot be
+    interrupted any other way; other documents caught in the restart are retried
+    once. Each worker's extra memory is capped with RLIMIT_AS.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 30, max_memory_mb: int = 512):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._stats = {"parsed": 0, "timeouts": 0, "crashes": 0, "restarts": 0}
+
+    def extract(self, data: bytes, ext: str, max_pages: Optional[int] = None) -> str:
+        """Extract text from raw document bytes; raises DocumentParseError on timeout or crash"""
+        for attempt in range(2):
+            executor = self._get_executor()
+            future = executor.submit(extract_text, data, ext, max_pages)
+            try:
+                text = future.result(timeout=self.timeout)
+                self._count("parsed")
+                return text
+            except FutureTimeoutError:
+                self._count("timeouts")
+                self._restart(executor)
+                raise DocumentParseError("parse_timeout", f"Document parsing took longer than {self.timeout:g}s")
+            except MemoryError:
+                self._count("crashes")
+                raise DocumentParseError("parse_memory", "Document parser ran out of memory")
+            except BrokenProcessPool:
+                self._restart(executor)
+                if attempt:
+                    self._count("crashes")
+                    raise DocumentParseError("parse_crashed", "Document parser crashed or ran out of memory")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # A pool created before a fork belongs to the parent process
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     initializer=_limit_worker_memory,
+                                                     initargs=(self.max_memory_mb,))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                return  # another thread already replaced it
+            self._executor = None
+            self._stats["restarts"] += 1
+
+        # Kill the workers outright: shutdown() alone would wait for the runaway parse
+        for process in list(getattr(executor, "_processes", {}).values()):
+            try:
+                process.kill()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Restarted document parsing pool")
+
+
+def pool_from_env() -> Optional[DocumentPool]:
+    """DocumentPool configured by RESUME_PARSE_WORKERS, RESUME_PARSE_TIMEOUT and RESUME_PARSE_MEMORY_MB.
+
+    Returns None (parse inline) when RESUME_PARSE_WORKERS is 0.
+    """
+    workers = int(os.environ.get("RESUME_PARSE_WORKERS", os.cpu_count() or 1))
+    if workers <= 0:
+        return None
+    return DocumentPool(max_workers=workers,
+                        timeout=float(os.environ.get("RESUME_PARSE_TIMEOUT", 30)),
+                        max_memory_mb=int(os.environ.get("RESUME_PARSE_MEMORY_MB", 512)))
@@ -0,0 +1,129 @@
+"""Streaming DOCX text extraction.
+
+A .docx file is a zip archive whose body is word/document.xml. Instead of
+building python-docx's object model, the body is read with iterparse straight
+from the compressed member, and every paragraph is yielded in document order
+as soon as it ends; table cells come out where the table is, not after all
+paragraphs. Parsed elements are cleared as they are consumed, so memory stays
+close to the size of the largest paragraph or table rather than the document.
+
+Merged table cells are emitted once: a horizontally merged cell is a single
+w:tc with w:gridSpan, and the continuation cells of a vertical merge
+(w:vMerge without "restart") are skipped. Text boxes are read from their
+DrawingML content and their VML fallback copy is ignored. Paragraphs whose
+style is a heading or title are flagged so callers can split sections.
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List, Set, Union
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+
+@dataclass
+class DocxBlock:
+    """One non-empty paragraph of the document body"""
+    text: str
+    # "paragraph" in the body or a text box, "cell" inside a table
+    kind: str
+    heading: bool = False
+
+
+def _heading_styles(archive: zipfile.ZipFile) -> Set[str]:
+    """Style ids of heading and title paragraph styles, including styles based on them"""
+    try:
+        root = ET.fromstring(archive.read("word/styles.xml"))
+    except (KeyError, ET.ParseError):
+        return set()
+
+    based_on = {}
+    headings = set()
+    for style in root.iter(f"{W}style"):
+        style_id = style.get(f"{W}styleId")
+        name = style.find(f"{W}name")
+        name = (name.get(f"{W}val") if name is not None else "").lower()
+        parent = style.find(f"{W}basedOn")
+        if parent is not None:
+            based_on[style_id] = parent.get(f"{W}val")
+        outline = style.find(f"{W}pPr/{W}outlineLvl")
+        if name.startswith("heading") or name == "title" or (outline is not None and outline.get(f"{W}val") != "9"):
+            headings.add(style_id)
+
+    for style_id in based_on:
+        seen = set()
+        parent = based_on.get(style_id)
+        while parent and parent not in seen:
+            if parent in headings:
+                headings.add(style_id)
+                break
+            seen.add(parent)
+            parent = based_on.get(parent)
+    return headings
+
+
+def iter_docx_blocks(source: Union[str, BinaryIO]) -> Iterator[DocxBlock]:
+    """Yield the non-empty paragraphs of a DOCX file (path or binary stream) in document order"""
+    with zipfile.ZipFile(source) as archive:
+        heading_styles = _heading_styles(archive)
+        with archive.open("word/document.xml") as body:
+            # One entry per open w:p: [text parts, heading]
+            paragraphs: List[list] = []
+            # One entry per open w:tc: whether it continues a vertical merge
+            cells: List[bool] = []
+            fallback_depth = 0
+
+            for event, elem in ET.iterparse(body, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag == MC_FALLBACK:
+                        fallback_depth += 1
+                    elif fallback_depth:
+                        continue
+                    elif tag == f"{W}p":
+                        paragraphs.append([[], False])
+                    elif tag == f"{W}tc":
+                        cells.append(False)
+                    continue
+
+                if tag == MC_FALLBACK:
+                    fallback_depth -= 1
+                    elem.clear()
+                elif fallback_depth:
+                    continue
+                elif tag == f"{W}t" and paragraphs:
+                    paragraphs[-1][0].append(elem.text or "")
+                elif tag == f"{W}tab" and paragraphs:
+                    paragraphs[-1][0].append("\t")
+                elif tag in (f"{W}br", f"{W}cr") and paragraphs:
+                    paragraphs[-1][0].append("\n")
+                elif tag == f"{W}pStyle" and paragraphs:
+                    paragraphs[-1][1] = elem.get(f"{W}val") in heading_styles
+                elif tag == f"{W}outlineLvl" and paragraphs:
+                    # Level 9 is body text
+                    paragraphs[-1][1] = elem.get(f"{W}val") != "9"
+                elif tag == f"{W}vMerge" and cells:
+                    cells[-1] = elem.get(f"{W}val", "continue") == "continue"
+                elif tag == f"{W}p":
+                    parts, heading = paragraphs.pop()
+                    text = "".join(parts)
+                    if text.strip() and not (cells and cells[-1]):
+                        yield DocxBlock(text, "cell" if cells else "paragraph", heading)
+                    elem.clear()
+                elif tag == f"{W}tc":
+                    cells.pop()
+                    elem.clear()
+                elif tag == f"{W}tbl":
+                    elem.clear()
+
+
+def docx_sections(source: Union[str, BinaryIO]) -> Dict[str, str]:
+    """The document's text split at heading paragraphs, keyed by heading ("" for text before the first one)"""
+    sections: Dict[str, List[str]] = {}
+    current = sections.setdefault("", [])
+    for block in iter_docx_blocks(source):
+        if block.heading:
+            current = sections.setdefault(block.text.strip(), [])
+        current.append(block.text)
+    return {heading: "\n".join(lines) for heading, lines in sections.items() if lines}
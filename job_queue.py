@@ -0,0 +1,348 @@
+"""Persistent background queue for analyses that should not hold an HTTP connection open.
+
+Jobs, their input files and their results live in one SQLite file, so every
+worker process of the server shares the queue and nothing is lost on restart;
+no external broker is needed. Each process runs a few worker threads that
+claim jobs in priority order: lane "interactive" (single uploads) before lane
+"bulk" (imports), oldest first within a lane. When there is more than one
+worker thread, the first one only takes interactive jobs, so a single upload
+never waits behind a batch of long bulk jobs that took every thread.
+
+A claimed job holds a lease that its process renews while it runs. If the
+process dies, the lease expires and another worker takes the job again, up to
+max_attempts runs in total. A handler exception is retried the same way after
+a short backoff. Finished jobs (and a callback POST of the result, if one was
+requested) are kept for ttl_seconds.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from metrics import ASYNC_JOBS
+
+logger = logging.getLogger(__name__)
+
+LANES = {"interactive": 0, "bulk": 1}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    lane TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    callback_url TEXT,
+    callback_status TEXT,
+    created REAL NOT NULL,
+    available REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    lease_until REAL,
+    worker TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, created);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, name)
+) WITHOUT ROWID;
+"""
+
+# handler(params, files) -> (result payload, HTTP-style status); 2xx results are "done", others "failed"
+JobHandler = Callable[[Dict[str, Any], Dict[str, bytes]], Tuple[Dict[str, Any], int]]
+
+
+class JobQueue:
+    """SQLite-backed job queue with priority lanes, leases, retries and result callbacks"""
+
+    def __init__(self, db_path: str, handlers: Dict[str, JobHandler], workers: int = 2, max_attempts: int = 3,
+                 lease_seconds: float = 300, ttl_seconds: float = 86400, poll_seconds: float = 0.5,
+                 callback_hosts: Optional[set] = None):
+        self.db_path = db_path
+        self.handlers = handlers
+        self.workers = max(0, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.lease_seconds = lease_seconds
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.callback_hosts = callback_hosts
+        self._db = None
+        self._pid = None
+        self._worker_pid = None
+        self._running = set()  # ids of jobs this process is working on, for lease renewal
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def submit(self, kind: str, params: Dict[str, Any], files: Optional[Dict[str, bytes]] = None,
+               lane: str = "interactive", callback_url: Optional[str] = None) -> str:
+        """Queue a job and return its id; raises ValueError for an unknown kind or lane or a rejected callback"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane: {lane} (use {' or '.join(LANES)})")
+        if callback_url:
+            self.check_callback_url(callback_url)
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute(
+                    "INSERT INTO jobs (id, kind, lane, priority, status, params, max_attempts, callback_url, "
+                    "created, available) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                    (job_id, kind, lane, LANES[lane], json.dumps(params), self.max_attempts, callback_url, now,
+                     now))
+                db.executemany("INSERT INTO job_files (job_id, name, data) VALUES (?, ?, ?)",
+                               [(job_id, name, data) for name, data in (files or {}).items()])
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        ASYNC_JOBS.inc(lane=lane, event="submitted")
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public view of a job: status, attempts, timestamps and, once finished, its result"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, kind, lane, status, result, error, attempts, created, started, finished, callback_status "
+                "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {"job_id": row[0], "kind": row[1], "lane": row[2], "status": row[3], "attempts": row[6],
+               "created": row[7], "started": row[8], "finished": row[9]}
+        if row[4] is not None:
+            job["result"] = json.loads(row[4])
+        if row[5]:
+            job["error"] = row[5]
+        if row[10]:
+            job["callback_status"] = row[10]
+        return job
+
+    def check_callback_url(self, url: str) -> None:
+        """Raise ValueError unless url is http(s) and, when an allow-list is configured, on an allowed host"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("callback_url must be an http or https URL")
+        if self.callback_hosts is not None and parsed.hostname.lower() not in self.callback_hosts:
+            raise ValueError(f"callback_url host {parsed.hostname} is not allowed")
+
+    def start(self) -> None:
+        """Start this process's worker threads (once per process; threads do not survive fork)"""
+        with self._lock:
+            if self._worker_pid == os.getpid() or self.workers == 0:
+                return
+            self._worker_pid = os.getpid()
+            self._running = set()
+            self._wake = threading.Event()
+        for index in range(self.workers):
+            # With several threads, the first one is kept free for interactive jobs
+            max_priority = LANES["interactive"] if index == 0 and self.workers > 1 else max(LANES.values())
+            threading.Thread(target=self._work, args=(max_priority,), name=f"job-worker-{index}",
+                             daemon=True).start()
+        threading.Thread(target=self._renew_leases, name="job-leases", daemon=True).start()
+
+    def resume_pending(self) -> None:
+        """Start the workers if the queue file already exists, so jobs left by an earlier run are picked up"""
+        if self._worker_pid != os.getpid() and os.path.exists(self.db_path):
+            self.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT lane, status, COUNT(*) FROM jobs GROUP BY lane, status").fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for lane, status, count in rows:
+            counts.setdefault(lane, {})[status] = count
+        return {"lanes": counts, "workers": self.workers}
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across fork; callers hold self._lock
+        if self._db is None or self._pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._db
+
+    def _claim(self, max_priority: int) -> Optional[Tuple[str, str, str, Dict[str, Any], Dict[str, bytes], int]]:
+        """Lease the next runnable job: queued and due, or running under an expired lease (its worker died)"""
+        worker = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    now = time.time()
+                    row = db.execute(
+                        "SELECT id, kind, lane, status, params, attempts, max_attempts FROM jobs "
+                        "WHERE priority <= ? AND ((status = 'queued' AND available <= ?) "
+                        "OR (status = 'running' AND lease_until < ?)) "
+                        "ORDER BY priority, created LIMIT 1", (max_priority, now, now)).fetchone()
+                    if row is None:
+                        db.execute("COMMIT")
+                        return None
+                    job_id, kind, lane, status, params, attempts, max_attempts = row
+                    if status == "running":
+                        ASYNC_JOBS.inc(lane=lane, event="recovered")
+                        if attempts >= max_attempts:
+                            self._finish_locked(db, job_id, "failed", None,
+                                                "The worker running this job stopped and no attempts are left")
+                            continue
+                    db.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, started = ?, "
+                               "lease_until = ?, worker = ? WHERE id = ?",
+                               (now, now + self.lease_seconds, worker, job_id))
+                    files = dict(db.execute("SELECT name, data FROM job_files WHERE job_id = ?",
+                                            (job_id,)).fetchall())
+                    db.execute("COMMIT")
+                    self._running.add(job_id)
+                    return job_id, kind, lane, json.loads(params), files, attempts + 1
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _work(self, max_priority: int) -> None:
+        while True:
+            try:
+                job = self._claim(max_priority)
+            except sqlite3.Error as e:
+                logger.error(f"Claiming a job failed: {e}")
+                job = None
+            if job is None:
+                self._purge()
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+
+            job_id, kind, lane, params, files, attempt = job
+            try:
+                result, status = self.handlers[kind](params, files)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed on attempt {attempt}: {e}")
+                self._retry_or_fail(job_id, lane, attempt, str(e))
+            else:
+                outcome = "done" if 200 <= status < 300 else "failed"
+                self._finish(job_id, outcome, result, result.get("error") if outcome == "failed" else None)
+                ASYNC_JOBS.inc(lane=lane, event=outcome)
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+    def _retry_or_fail(self, job_id: str, lane: str, attempt: int, error: str) -> None:
+        with self._lock:
+            db = self._connection()
+            row = db.execute("SELECT max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and attempt < row[0]:
+                backoff = min(60, 2 ** attempt)
+                db.execute("UPDATE jobs SET status = 'queued', available = ?, error = ?, lease_until = NULL "
+                           "WHERE id = ?", (time.time() + backoff, error, job_id))
+                ASYNC_JOBS.inc(lane=lane, event="retried")
+                return
+        self._finish(job_id, "failed", None, error)
+        ASYNC_JOBS.inc(lane=lane, event="failed")
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._finish_locked(db, job_id, status, result, error)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            callback_url = db.execute("SELECT callback_url FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if callback_url and callback_url[0]:
+            self._send_callback(job_id, callback_url[0])
+
+    def _finish_locked(self, db: sqlite3.Connection, job_id: str, status: str, result: Optional[Dict[str, Any]],
+                       error: Optional[str]) -> None:
+        db.execute("UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, lease_until = NULL "
+                   "WHERE id = ?",
+                   (status, json.dumps(result) if result is not None else None, error, time.time(), job_id))
+        # The inputs are no longer needed once the job will not run again
+        db.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+
+    def _send_callback(self, job_id: str, url: str, attempts: int = 3) -> None:
+        """POST the finished job to its callback URL, retrying briefly; the outcome is kept on the job"""
+        body = json.dumps(self.get(job_id)).encode("utf-8")
+        outcome = "failed"
+        for attempt in range(attempts):
+            try:
+                request = urllib.request.Request(url, data=body, method="POST",
+                                                 headers={"Content-Type": "application/json"})
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    outcome = f"delivered ({response.status})"
+                break
+            except Exception as e:
+                logger.warning(f"Callback for job {job_id} to {url} failed (attempt {attempt + 1}): {e}")
+                if attempt + 1 < attempts:
+                    time.sleep(2 ** attempt)
+        with self._lock:
+            self._connection().execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (outcome, job_id))
+
+    def _renew_leases(self) -> None:
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._lock:
+                running = list(self._running)
+                if not running:
+                    continue
+                try:
+                    self._connection().executemany(
+                        "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                        [(time.time() + self.lease_seconds, job_id) for job_id in running])
+                except sqlite3.Error as e:
+                    logger.error(f"Renewing job leases failed: {e}")
+
+    def _purge(self) -> None:
+        """Delete jobs finished more than ttl_seconds ago, at most once a minute"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < 60:
+                return
+            self._last_purge = now
+            try:
+                self._connection().execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?",
+                                           (now - self.ttl_seconds,))
+            except sqlite3.Error as e:
+                logger.error(f"Purging finished jobs failed: {e}")
+
+
+def job_queue_from_env(handlers: Dict[str, JobHandler]) -> JobQueue:
+    """JobQueue configured by environment variables.
+
+    RESUME_JOBS_PATH: SQLite file holding the queue (default jobs.db).
+    RESUME_JOB_WORKERS: worker threads per process (default 2, 0 only queues).
+    RESUME_JOB_ATTEMPTS: runs per job before it fails (default 3).
+    RESUME_JOB_LEASE_SECONDS: how long a job of a dead process stays claimed (default 300).
+    RESUME_JOB_TTL: seconds finished jobs are kept (default 86400).
+    RESUME_JOB_CALLBACK_HOSTS: comma-separated hosts callbacks may go to (default: any).
+    """
+    hosts = os.environ.get("RESUME_JOB_CALLBACK_HOSTS", "")
+    return JobQueue(
+        os.environ.get("RESUME_JOBS_PATH", "jobs.db"), handlers,
+        workers=int(os.environ.get("RESUME_JOB_WORKERS", 2)),
+        max_attempts=int(os.environ.get("RESUME_JOB_ATTEMPTS", 3)),
+        lease_seconds=float(os.environ.get("RESUME_JOB_LEASE_SECONDS", 300)),
+        ttl_seconds=float(os.environ.get("RESUME_JOB_TTL", 86400)),
+        callback_hosts={host.strip().lower() for host in hosts.split(",") if host.strip()} or None)
@@ -0,0 +1,162 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The metrics of one process, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "resume_stage_seconds", "Time spent in each upload and analysis stage", ["stage", "file_type"])
+CACHE_LOOKUPS = REGISTRY.counter(
+    "resume_cache_lookups_total", "Cache lookups by cache and result (hit, disk_hit or miss)", ["cache", "result"])
+SUMMARY_FALLBACKS = REGISTRY.counter(
+    "resume_summary_fallbacks_total", "Summaries produced by simple_summarize instead of the model", ["reason"])
+EXTRACTION_ERRORS = REGISTRY.counter(
+    "resume_extraction_errors_total", "Documents whose text could not be extracted", ["file_type", "code"])
+SEMANTIC_FALLBACKS = REGISTRY.counter(
+    "resume_semantic_fallbacks_total", "Resumes scored with exact skill matches only in semantic mode", ["reason"])
+COALESCED_REQUESTS = REGISTRY.counter(
+    "resume_coalesced_requests_total",
+    "Requests by whether they ran (leader) or reused an in-flight or recent identical request", ["endpoint", "result"])
+ASYNC_JOBS = REGISTRY.counter(
+    "resume_async_jobs_total",
+    "Background analysis jobs by lane and event (submitted, done, failed, retried, recovered)", ["lane", "event"])
+
+
+class StageTimer:
+    """Times the stages of one request, feeding STAGE_SECONDS and an optional per-request timings block"""
+
+    def __init__(self, file_type: Optional[str] = None):
+        self.file_type = (file_type or "none").lstrip(".")
+        self.timings = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, file_type: Optional[str] = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            label = file_type.lstrip(".") if file_type else self.file_type
+            STAGE_SECONDS.observe(elapsed, stage=name, file_type=label)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations and the total so far, in milliseconds"""
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()}
+        timings["total"] = round((time.perf_counter() - self._start) * 1000, 3)
+        return timings
+
+
+def render_metrics() -> Tuple[str, str]:
+    """(body, content type) for a /metrics response"""
+    return REGISTRY.render(), CONTENT_TYPE
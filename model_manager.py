@@ -0,0 +1,233 @@
+import gc
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional
+
+if TYPE_CHECKING:  # socket is only imported when a model server is actually used
+    import socket
+
+logger = logging.getLogger(__name__)
+
+# Pipeline task and model for every named model
+MODEL_SPECS = {
+    "summarizer": ("summarization", "sshleifer/distilbart-cnn-12-6"),
+    "generator": ("text2text-generation", "google/flan-t5-base"),
+    # Sentence embeddings for semantic skill matching (see semantic_skills.py)
+    "embedder": ("feature-extraction", "sentence-transformers/all-MiniLM-L6-v2"),
+}
+
+# Models warm() loads when not told which; the embedder is only loaded once semantic matching asks for it
+DEFAULT_MODELS = ("summarizer", "generator")
+
+# Seconds to wait before retrying a model that failed to load
+RETRY_AFTER_FAILURE = 300
+
+
+def load_local_pipeline(name: str) -> Any:
+    """Load a transformers pipeline in this process"""
+    from transformers import pipeline
+
+    task, model = MODEL_SPECS[name]
+    return pipeline(task, model=model)
+
+
+def send_message(sock: "socket.socket", payload: Any) -> None:
+    data = json.dumps(payload).encode("utf-8")
+    sock.sendall(struct.pack("!I", len(data)) + data)
+
+
+def recv_message(sock: "socket.socket") -> Any:
+    header = _recv_exact(sock, 4)
+    (length,) = struct.unpack("!I", header)
+    return json.loads(_recv_exact(sock, length).decode("utf-8"))
+
+
+def _recv_exact(sock: "socket.socket", size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Model server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class RemotePipeline:
+    """Callable stand-in for a pipeline that runs in the model server sidecar (see model_server.py)"""
+
+    def __init__(self, socket_path: str, name: str, timeout: float = 60):
+        self.socket_path = socket_path
+        self.name = name
+        self.timeout = timeout
+
+    def __call__(self, inputs, **kwargs):
+        import socket
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            send_message(sock, {"model": self.name, "inputs": inputs, "kwargs": kwargs})
+            reply = recv_message(sock)
+        if "error" in reply:
+            raise RuntimeError(f"Model server error: {reply['error']}")
+        return reply["outputs"]
+
+
+class ModelManager:
+    """Loads models once, on first use, in a background thread.
+
+    get() never blocks by default: if the model is not loaded yet it starts loading
+    it and returns None so callers can fall back to rule-based output. warm() loads
+    up front, e.g. in the gunicorn master with preload_app so forked workers share
+    the weights copy-on-write. With idle_timeout > 0, models that have not been
+    used for that many seconds are unloaded.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_local_pipeline, idle_timeout: float = 0,
+                 enabled: bool = True):
+        self.loader = loader
+        self.idle_timeout = idle_timeout
+        self.enabled = enabled
+        self._models = {}
+        self._last_used = {}
+        self._loading = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._reaper_pid = None
+
+    def get(self, name: str, wait: bool = False, timeout: Optional[float] = None) -> Optional[Any]:
+        """Return the loaded model, or None while it is still loading (unless wait is set)"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                self._last_used[name] = time.monotonic()
+        if model is not None:
+            self._ensure_reaper()
+            return model
+
+        with self._lock:
+            thread = self._start_loading(name)
+
+        if wait and thread is not None:
+            thread.join(timeout)
+            with self._lock:
+                model = self._models.get(name)
+                if model is not None:
+                    self._last_used[name] = time.monotonic()
+                return model
+        return None
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def warm(self, names: Optional[Iterable[str]] = None, block: bool = True) -> None:
+        """Start loading the given models (DEFAULT_MODELS if none are given)"""
+        for name in names or DEFAULT_MODELS:
+            self.get(name, wait=block)
+
+    def unload(self, name: str) -> None:
+        with self._lock:
+            model = self._models.pop(name, None)
+            self._last_used.pop(name, None)
+        if model is not None:
+            del model
+            gc.collect()
+            logger.info(f"Unloaded idle model {name}")
+
+    def status(self) -> Dict[str, str]:
+        """Non-blocking per-model state: loaded, loading, failed, not loaded or disabled"""
+        with self._lock:
+            states = {}
+            for name in MODEL_SPECS:
+                if not self.enabled:
+                    states[name] = "disabled"
+                elif name in self._models:
+                    states[name] = "loaded"
+                elif name in self._loading:
+                    states[name] = "loading"
+                elif name in self._failed:
+                    states[name] = "failed"
+                else:
+                    states[name] = "not loaded"
+            return states
+
+    def _start_loading(self, name: str) -> Optional[threading.Thread]:
+        # Caller holds self._lock
+        thread = self._loading.get(name)
+        if thread is not None:
+            return thread
+
+        failed_at = self._failed.get(name)
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER_FAILURE:
+            return None
+
+        thread = threading.Thread(target=self._load, args=(name,), name=f"load-{name}", daemon=True)
+        self._loading[name] = thread
+        thread.start()
+        return thread
+
+    def _load(self, name: str) -> None:
+        try:
+            logger.info(f"Loading model {name}...")
+            started = time.monotonic()
+            model = self.loader(name)
+            if model is None:
+                raise RuntimeError("loader returned no model")
+            with self._lock:
+                self._models[name] = model
+                self._last_used[name] = time.monotonic()
+                self._failed.pop(name, None)
+            logger.info(f"Model {name} loaded in {time.monotonic() - started:.1f}s")
+            self._ensure_reaper()
+        except Exception as e:
+            logger.error(f"Model {name} loading failed: {e}")
+            with self._lock:
+                self._failed[name] = time.monotonic()
+        finally:
+            with self._lock:
+                self._loading.pop(name, None)
+
+    def _ensure_reaper(self) -> None:
+        # Threads do not survive fork, so every worker process starts its own reaper
+        if self.idle_timeout <= 0 or self._reaper_pid == os.getpid():
+            return
+        self._reaper_pid = os.getpid()
+        threading.Thread(target=self._reap_idle, name="model-reaper", daemon=True).start()
+
+    def _reap_idle(self) -> None:
+        while True:
+            time.sleep(max(1.0, min(self.idle_timeout / 2, 60)))
+            now = time.monotonic()
+            with self._lock:
+                idle = [name for name, used in self._last_used.items() if now - used > self.idle_timeout]
+            for name in idle:
+                self.unload(name)
+
+
+def models_from_env() -> ModelManager:
+    """Build the ModelManager configured by environment variables.
+
+    RESUME_MODELS: "lazy" (default) loads on first use, "preload" is meant to be
+        warmed at startup by the server, "off" disables model summaries.
+    RESUME_MODEL_IDLE_TIMEOUT: seconds before an unused model is unloaded (0 = never).
+    RESUME_MODEL_SOCKET: path of a model_server.py Unix socket; models then run in
+        that single sidecar process instead of in every worker.
+    """
+    mode = os.environ.get("RESUME_MODELS", "lazy").lower()
+    idle_timeout = float(os.environ.get("RESUME_MODEL_IDLE_TIMEOUT", 0))
+    socket_path = os.environ.get("RESUME_MODEL_SOCKET")
+
+    if socket_path:
+        loader = lambda name: RemotePipeline(socket_path, name)
+    else:
+        loader = load_local_pipeline
+    return ModelManager(loader=loader, idle_timeout=idle_timeout, enabled=mode != "off")
@@ -0,0 +1,81 @@
+"""Model serving sidecar.
+
+Runs the transformers pipelines in one process and answers requests from the
+API workers over a Unix socket, so the models are loaded once per host instead
+of once per gunicorn worker. Start it and point the workers at it:
+
+    python model_server.py --socket /tmp/resume-models.sock
+    RESUME_MODEL_SOCKET=/tmp/resume-models.sock gunicorn app:app
+"""
+import argparse
+import logging
+import os
+import socketserver
+import threading
+
+from model_manager import MODEL_SPECS, ModelManager, load_local_pipeline, recv_message, send_message
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            request = recv_message(self.request)
+            name = request.get("model")
+            if name not in MODEL_SPECS:
+                send_message(self.request, {"error": f"Unknown model: {name}"})
+                return
+
+            model = self.server.manager.get(name, wait=True)
+            if model is None:
+                send_message(self.request, {"error": f"Model {name} is not available"})
+                return
+
+            # Pipelines are not guaranteed to be thread-safe
+            with self.server.locks[name]:
+                outputs = model(request.get("inputs"), **request.get("kwargs", {}))
+            send_message(self.request, {"outputs": outputs})
+        except Exception as e:
+            logger.error(f"Model request failed: {e}")
+            try:
+                send_message(self.request, {"error": str(e)})
+            except OSError:
+                pass
+
+
+class ModelServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, manager: ModelManager):
+        self.manager = manager
+        self.locks = {name: threading.Lock() for name in MODEL_SPECS}
+        super().__init__(socket_path, ModelRequestHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the resume analyzer models over a Unix socket")
+    parser.add_argument("--socket", default="/tmp/resume-models.sock", help="Unix socket path")
+    parser.add_argument("--idle-timeout", type=float, default=0,
+                        help="Unload models unused for this many seconds (0 = never)")
+    parser.add_argument("--no-warm", action="store_true", help="Load models on first request instead of at startup")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    manager = ModelManager(loader=load_local_pipeline, idle_timeout=args.idle_timeout)
+    if not args.no_warm:
+        manager.warm(block=True)
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+
+    with ModelServer(args.socket, manager) as server:
+        logger.info(f"Model server listening on {args.socket}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
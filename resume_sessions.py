@@ -0,0 +1,157 @@
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from analysis_cache import LRUCache
+from analysis_result import AnalysisResult, render_result
+from metrics import StageTimer
+from Resume import (NOT_A_RESUME_ERROR, JobProfile, TextFacts, count_skill_hits, detect_job_role_from_text,
+                    extract_contact_info, extract_education, extract_text_facts, get_job_profile, get_taxonomy,
+                    merge_text_facts, score_extracted_resume, summarize_resume, summary_source_key,
+                    validate_resume_content)
+
+logger = logging.getLogger(__name__)
+
+
+def _facts_to_dict(facts: TextFacts) -> Dict[str, Any]:
+    data = asdict(facts)
+    data["phones"] = {str(index): phone for index, phone in facts.phones.items()}
+    data["sections"] = sorted(facts.sections)
+    return data
+
+
+def _facts_from_dict(data: Dict[str, Any]) -> TextFacts:
+    data = dict(data)
+    data["phones"] = {int(index): phone for index, phone in data["phones"].items()}
+    data["sections"] = set(data["sections"])
+    return TextFacts(**data)
+
+
+def analyze_section(text: str, taxonomy=None) -> Dict[str, Any]:
+    """Everything the merged analysis needs from one section, as a JSON-serializable dict"""
+    return {
+        "text": text,
+        "facts": _facts_to_dict(extract_text_facts(text)),
+        "skill_hits": dict(count_skill_hits(text, taxonomy)),
+        "education": extract_education(text, limit=None),
+        "resume_like": validate_resume_content(text),
+    }
+
+
+class SessionStore:
+    """Per-document analysis state for resumes that are edited one section at a time.
+
+    A session keeps the regex facts, skill hits and education lines of every
+    section of a document. An update re-extracts only the sections it changes,
+    merges the stored per-section results and rescores the merged totals, so
+    an edit costs one section's scans instead of the whole pipeline. The
+    model summary is reused while the text it was written from is unchanged.
+
+    Sessions live in an LRUCache (RESUME_SESSIONS_SIZE / RESUME_SESSIONS_PATH),
+    so a SQLite path lets every worker continue any session. Concurrent updates
+    to the same document are last-writer-wins.
+    """
+
+    def __init__(self, cache: LRUCache):
+        self.cache = cache
+
+    def update(self, document_id: str, sections: Dict[str, Optional[str]], order: Optional[Sequence[str]] = None,
+               jd_text: Optional[str] = None, target_role: Optional[str] = None,
+               job_profile: Optional[JobProfile] = None,
+               timer: Optional[StageTimer] = None, compact: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+        """Apply changed sections (None removes one) and return the analysis and the re-extracted section names.
+
+        Sections are joined in `order`, or in the order they were first sent.
+        jd_text, target_role and job_profile replace the session's job when given.
+        compact returns the analysis without display strings.
+        """
+        timer = timer or StageTimer()
+        taxonomy = get_taxonomy()
+        session = self.cache.get(document_id) or {"order": [], "sections": {}, "job": {}, "summary": None}
+
+        job = session["job"]
+        if job_profile is not None:
+            job = {"job_id": job_profile.job_id}
+        elif jd_text is not None or target_role is not None:
+            job = {"target_role": target_role or "Auto-detect", "jd_text": jd_text or ""}
+
+        if taxonomy.digest != session.get("taxonomy"):
+            # Skill hits depend on the taxonomy: recount every section once when it changes
+            session["taxonomy"] = taxonomy.digest
+            for section in session["sections"].values():
+                section["skill_hits"] = dict(count_skill_hits(section["text"], taxonomy))
+            job.pop("jd_role", None)
+        if job.get("jd_text") and "jd_role" not in job:
+            # The JD is only used for its role, so detect it once per session rather than per update
+            job["jd_role"] = detect_job_role_from_text(job["jd_text"], taxonomy=taxonomy)
+        session["job"] = job
+
+        changed = []
+        with timer.stage("facts"):
+            for name, text in sections.items():
+                if text is None:
+                    session["sections"].pop(name, None)
+                    continue
+                previous = session["sections"].get(name)
+                if previous is None or previous["text"] != text:
+                    session["sections"][name] = analyze_section(text, taxonomy)
+                    changed.append(name)
+
+        if order is not None:
+            session["order"] = list(order)
+        session["order"] = [name for name in session["order"] if name in session["sections"]]
+        session["order"] += [name for name in session["sections"] if name not in session["order"]]
+
+        result = self._score(session, taxonomy, timer)
+        self.cache.set(document_id, session)
+        return render_result(result, compact), changed
+
+    def delete(self, document_id: str) -> bool:
+        """Forget a session; returns whether it existed"""
+        return self.cache.delete(document_id)
+
+    def _score(self, session: Dict[str, Any], taxonomy, timer: StageTimer) -> Union[AnalysisResult, Dict[str, Any]]:
+        parts = [session["sections"][name] for name in session["order"]]
+        resume_text = "\n".join(part["text"] for part in parts)
+        if len(resume_text) < 50:
+            return {"error": "Invalid or unreadable resume."}
+        if not any(part["resume_like"] for part in parts):
+            return {"error": NOT_A_RESUME_ERROR}
+
+        job = session["job"]
+        job_profile = None
+        if job.get("job_id"):
+            job_profile = get_job_profile(job["job_id"])
+            if job_profile is None:
+                return {"error": f"Unknown job_id: {job['job_id']}"}
+
+        try:
+            with timer.stage("contact"):
+                facts = merge_text_facts([_facts_from_dict(part["facts"]) for part in parts])
+                contact_info = extract_contact_info(resume_text, facts)
+                education = [line for part in parts for line in part["education"]][:3]
+                skill_hits = {}
+                for part in parts:
+                    for term, count in part["skill_hits"].items():
+                        skill_hits[term] = skill_hits.get(term, 0) + count
+
+            # Keep the model summary until the text it was written from changes
+            with timer.stage("summary"):
+                summary_key = summary_source_key(resume_text)
+                cached = session.get("summary")
+                if cached and cached["key"] == summary_key:
+                    summary = cached["text"]
+                else:
+                    summary, from_model = summarize_resume(resume_text)
+                    session["summary"] = {"key": summary_key, "text": summary} if from_model else None
+
+            result, _ = score_extracted_resume(resume_text, facts, contact_info, education, skill_hits, summary,
+                                               target_role=job.get("target_role", "Auto-detect"),
+                                               jd_role=job.get("jd_role"), job_profile=job_profile,
+                                               taxonomy=taxonomy, timer=timer)
+            return result
+
+        except Exception as e:
+            error_msg = f"Error analyzing resume: {str(e)}"
+            logger.error(error_msg)
+            return {"error": error_msg}
@@ -0,0 +1,238 @@
+"""Optional semantic skill matching (RESUME_SEMANTIC_SKILLS=1).
+
+Exact matching only credits a skill whose name (or alias) appears in the text.
+In semantic mode, phrases of the resume are also compared with every taxonomy
+skill by sentence-embedding cosine similarity, so "Postgres" can count toward
+SQL or "data viz" toward Data Visualization.
+
+- The skill embeddings are computed once per taxonomy and model, saved as a
+  .npy file and memory-mapped, so every worker shares one copy through the
+  page cache. The file is built in the background the first time it is needed.
+- Candidate phrases (runs of words between punctuation and stop words, and
+  their one- and two-word parts) are embedded in batches; embeddings are kept
+  in an LRU cache shared by all requests of the process.
+- All phrases are matched against all skills with one matrix product.
+- When the embedding model or index is not ready, or embedding the new phrases
+  would exceed the latency budget, the exact hits are used unchanged.
+
+numpy is only imported once semantic matching is used.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import SEMANTIC_FALLBACKS
+from taxonomy import Taxonomy
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STOP_WORDS = frozenset("""
+a an the and or of in on at to for from with by as is are was were be been using used use via into over
+under within across including such etc my our their his her i we they he she it its this that these those
+will would can could also both each per other all any more most than then while during about years year
+""".split())
+
+# Phrase boundaries: punctuation, bullets and line breaks (a period only when a space or the end follows)
+PHRASE_BREAK = re.compile(r"[\n\r\t,;:|•·●▪()\[\]{}!?\"]+|\.(?=\s|$)")
+WORD = re.compile(r"[a-z0-9][a-z0-9+#./&-]*")
+
+
+def candidate_phrases(text: str, max_words: int = 4, limit: int = 512) -> List[str]:
+    """Distinct noun-phrase-like candidates of text, in order of first appearance"""
+    phrases = {}
+    for chunk in PHRASE_BREAK.split(text.lower()):
+        run = []
+        for word in WORD.findall(chunk) + [""]:
+            if word and word not in STOP_WORDS and not word.isdigit():
+                run.append(word.rstrip("./-"))
+                continue
+            if run:
+                if len(run) <= max_words:
+                    phrases.setdefault(" ".join(run), None)
+                for n in (1, 2):
+                    for i in range(len(run) - n + 1):
+                        phrases.setdefault(" ".join(run[i:i + n]), None)
+                run = []
+            if len(phrases) >= limit:
+                return list(phrases)[:limit]
+    return list(phrases)
+
+
+def pooled_embeddings(outputs: Sequence[Any]) -> "np.ndarray":
+    """Mean-pool feature-extraction pipeline outputs into unit-length float32 rows"""
+    import numpy as np
+
+    rows = []
+    for output in outputs:
+        tokens = np.asarray(output, dtype=np.float32)
+        rows.append(tokens.reshape(-1, tokens.shape[-1]).mean(axis=0))
+    matrix = np.vstack(rows)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class SemanticSkillMatcher:
+    """Adds semantically matched skills to exact skill hits, within a latency budget"""
+
+    def __init__(self, get_embedder: Callable[[], Any], index_dir: str, threshold: float = 0.6,
+                 budget_ms: float = 200, batch_size: int = 64, cache_size: int = 50000,
+                 model_name: str = "embedder"):
+        self.get_embedder = get_embedder
+        self.index_dir = index_dir
+        self.threshold = threshold
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.model_name = model_name
+        self._phrase_cache = OrderedDict()  # phrase -> unit embedding
+        self._indexes = {}  # taxonomy digest -> (skill terms, memory-mapped matrix)
+        self._building = set()
+        self._lock = threading.Lock()
+
+    def augment(self, text: str, skill_hits: Dict[str, int], taxonomy: Taxonomy) -> Tuple[Dict[str, int], bool]:
+        """skill_hits plus the taxonomy skills matched only semantically, and whether semantic matching ran.
+
+        A semantic match counts once per phrase that matched the skill. Skills
+        already found exactly are left as they are.
+        """
+        start = time.perf_counter()
+        try:
+            embedder = self.get_embedder()
+            if embedder is None:
+                SEMANTIC_FALLBACKS.inc(reason="model_unavailable")
+                return skill_hits, False
+            index = self._index(taxonomy, embedder)
+            if index is None:
+                SEMANTIC_FALLBACKS.inc(reason="index_building")
+                return skill_hits, False
+            skills, matrix = index
+
+            phrases = [phrase for phrase in candidate_phrases(text) if phrase not in skill_hits]
+            vectors = self._embed(embedder, phrases, deadline=start + self.budget_ms / 1000)
+            if vectors is None:
+                SEMANTIC_FALLBACKS.inc(reason="budget")
+                return skill_hits, False
+            if not phrases:
+                return skill_hits, True
+
+            import numpy as np
+
+            # phrases x skills cosine similarities in one product (rows are unit length)
+            matches = (vectors @ matrix.T) >= self.threshold
+            counts = matches.sum(axis=0)
+            hits = dict(skill_hits)
+            for column in np.flatnonzero(counts):
+                if not hits.get(skills[column]):
+                    hits[skills[column]] = int(counts[column])
+            return hits, True
+
+        except Exception as e:
+            logger.error(f"Semantic skill matching failed: {e}")
+            SEMANTIC_FALLBACKS.inc(reason="error")
+            return skill_hits, False
+
+    def _embed(self, embedder: Any, phrases: List[str], deadline: Optional[float] = None) -> Optional["np.ndarray"]:
+        """Unit embeddings of phrases, from the cache where possible; None if the deadline passes first"""
+        import numpy as np
+
+        with self._lock:
+            cached = {phrase: self._phrase_cache[phrase] for phrase in phrases if phrase in self._phrase_cache}
+            for phrase in cached:
+                self._phrase_cache.move_to_end(phrase)
+
+        missing = [phrase for phrase in phrases if phrase not in cached]
+        for i in range(0, len(missing), self.batch_size):
+            if deadline is not None and time.perf_counter() > deadline:
+                # Keep what was embedded so far: the next request for this resume needs fewer phrases
+                return None
+            batch = missing[i:i + self.batch_size]
+            vectors = pooled_embeddings(embedder(batch))
+            with self._lock:
+                for phrase, vector in zip(batch, vectors):
+                    cached[phrase] = vector
+                    self._phrase_cache[phrase] = vector
+                while len(self._phrase_cache) > self.cache_size:
+                    self._phrase_cache.popitem(last=False)
+
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        if not phrases:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([cached[phrase] for phrase in phrases])
+
+    def _index(self, taxonomy: Taxonomy, embedder: Any) -> Optional[Tuple[List[str], "np.ndarray"]]:
+        """(skill terms, memory-mapped embedding matrix) for the taxonomy, or None while it is being built"""
+        with self._lock:
+            index = self._indexes.get(taxonomy.digest)
+            if index is not None or taxonomy.digest in self._building:
+                return index
+
+            path = self._index_path(taxonomy)
+            if os.path.exists(path + ".npy") and os.path.exists(path + ".json"):
+                import numpy as np
+
+                with open(path + ".json", encoding="utf-8") as f:
+                    skills = json.load(f)
+                index = self._indexes[taxonomy.digest] = (skills, np.load(path + ".npy", mmap_mode="r"))
+                return index
+
+            self._building.add(taxonomy.digest)
+        threading.Thread(target=self._build_index, args=(taxonomy, embedder, path), name="skill-index",
+                         daemon=True).start()
+        return None
+
+    def _index_path(self, taxonomy: Taxonomy) -> str:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", self.model_name)
+        return os.path.join(self.index_dir, f"skills-{name}-{taxonomy.digest[:16]}")
+
+    def _build_index(self, taxonomy: Taxonomy, embedder: Any, path: str) -> None:
+        try:
+            import numpy as np
+
+            roles = {role.lower() for role in taxonomy.roles}
+            skills = [term for term in taxonomy.terms if term not in roles]
+            started = time.monotonic()
+            matrix = self._embed(embedder, skills) if skills else np.zeros((0, 1), dtype=np.float32)
+
+            # Write under temporary names and rename, so other workers never map a partial file
+            os.makedirs(self.index_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.index_dir, suffix=".npy", delete=False) as f:
+                np.save(f, matrix.astype(np.float32))
+            os.replace(f.name, path + ".npy")
+            with tempfile.NamedTemporaryFile("w", dir=self.index_dir, suffix=".json", delete=False,
+                                             encoding="utf-8") as f:
+                json.dump(skills, f)
+            os.replace(f.name, path + ".json")
+            logger.info(f"Built semantic index of {len(skills)} skills in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Building the semantic skill index failed: {e}")
+        finally:
+            with self._lock:
+                self._building.discard(taxonomy.digest)
+
+
+def semantic_from_env(get_embedder: Callable[[], Any],
+                      model_name: str = "embedder") -> Optional[SemanticSkillMatcher]:
+    """SemanticSkillMatcher configured by environment variables, or None unless RESUME_SEMANTIC_SKILLS is set.
+
+    RESUME_SEMANTIC_THRESHOLD: minimum cosine similarity for a match (default 0.6).
+    RESUME_SEMANTIC_BUDGET_MS: time allowed per resume before falling back to exact matches (default 200).
+    RESUME_SEMANTIC_INDEX_DIR: where the skill embedding files are kept (default: a temp directory).
+    """
+    if os.environ.get("RESUME_SEMANTIC_SKILLS", "").lower() not in ("1", "true", "yes", "on"):
+        return None
+    return SemanticSkillMatcher(
+        get_embedder,
+        index_dir=os.environ.get("RESUME_SEMANTIC_INDEX_DIR") or os.path.join(tempfile.gettempdir(),
+                                                                             "resume-skill-index"),
+        threshold=float(os.environ.get("RESUME_SEMANTIC_THRESHOLD", 0.6)),
+        budget_ms=float(os.environ.get("RESUME_SEMANTIC_BUDGET_MS", 200)), model_name=model_name)
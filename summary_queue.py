@@ -0,0 +1,133 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryBatcher:
+    """Micro-batching front end for a summarization pipeline.
+
+    Callers enqueue a text and wait for its summary. A single worker thread drains
+    the queue, flushing a batch once it has max_batch items or the oldest item has
+    waited max_wait_ms, and runs one batched pipeline call for the whole batch.
+    If a summary does not arrive within the latency budget, summarize() returns
+    None and the caller falls back to a rule-based summary.
+    """
+
+    def __init__(self, get_model: Callable[[], Optional[Any]], max_batch: int = 8, max_wait_ms: float = 20,
+                 budget_ms: float = 3000, model_kwargs: Optional[Dict[str, Any]] = None):
+        self.get_model = get_model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.budget = budget_ms / 1000
+        self.model_kwargs = model_kwargs or {}
+        self._queue = queue.Queue()
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "items": 0, "timeouts": 0, "errors": 0}
+
+    def summarize(self, text: str, budget_ms: Optional[float] = None) -> Optional[str]:
+        """Summary text, or None if the model is unavailable or the budget runs out"""
+        return self.summarize_many([text], budget_ms)[0]
+
+    def summarize_many(self, texts: List[str], budget_ms: Optional[float] = None) -> List[Optional[str]]:
+        """Summaries of several texts, queued together so they share batches; None for any that missed the budget"""
+        if not texts or self.get_model() is None:
+            return [None] * len(texts)
+
+        self._ensure_worker()
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text, future))
+            futures.append(future)
+
+        deadline = time.monotonic() + (self.budget if budget_ms is None else budget_ms / 1000)
+        summaries = []
+        for future in futures:
+            try:
+                summaries.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                # Skip the item if the worker has not picked it up yet
+                future.cancel()
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                summaries.append(None)
+            except Exception as e:
+                logger.error(f"Batched summarization failed: {e}")
+                summaries.append(None)
+        return summaries
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork, so each worker process starts its own
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="summary-batcher", daemon=True).start()
+
+    def _next_batch(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            # Drop items whose callers already gave up
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            model = self.get_model()
+            if model is None:
+                for _, future in batch:
+                    future.set_exception(RuntimeError("Summarization model is not available"))
+                continue
+
+            texts = [text for text, _ in batch]
+            try:
+                outputs = model(texts, batch_size=len(texts), **self.model_kwargs)
+                for (_, future), output in zip(batch, outputs):
+                    future.set_result(output["summary_text"])
+                with self._lock:
+                    self._stats["batches"] += 1
+                    self._stats["items"] += len(batch)
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+def batcher_from_env(get_model: Callable[[], Optional[Any]], **model_kwargs) -> SummaryBatcher:
+    """Build a SummaryBatcher configured by RESUME_SUMMARY_BATCH, RESUME_SUMMARY_WAIT_MS and
+    RESUME_SUMMARY_BUDGET_MS environment variables"""
+    return SummaryBatcher(
+        get_model,
+        max_batch=int(os.environ.get("RESUME_SUMMARY_BATCH", 8)),
+        max_wait_ms=float(os.environ.get("RESUME_SUMMARY_WAIT_MS", 20)),
+        budget_ms=float(os.environ.get("RESUME_SUMMARY_BUDGET_MS", 3000)),
+        model_kwargs=model_kwargs,
+    )
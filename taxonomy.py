@@ -0,0 +1,305 @@
+"""Skill taxonomy: roles, their weighted skills, and aliases, compiled for fast matching.
+
+A Taxonomy is built once from a dict (the built-in one in Resume.py or a JSON /
+YAML file) and never changed afterwards. All of its terms and aliases go into a
+single trie-shaped regex, so a scan costs about the same for ten roles as for a
+thousand, and role detection walks an inverted index from term to roles instead
+of every role's skill list. TaxonomyStore watches the file and swaps in a newly
+compiled Taxonomy in one assignment; callers take one reference per request and
+keep using it, so a reload never changes the taxonomy under a running analysis.
+
+File format (JSON, or YAML when PyYAML is installed):
+
+    version: "2024-06-01"
+    weights: {core: 3, important: 2, nice_to_have: 1}
+    roles:
+      DevOps Engineer:
+        core: [Docker, CI/CD, Cloud Platforms, Monitoring]
+        important: [Kubernetes, AWS, Jenkins, Terraform]
+    default: {core: [Communication, Teamwork, Problem Solving]}
+    aliases:
+      Kubernetes: [k8s, kube]
+      SQL: [Postgres, PostgreSQL, MySQL]
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from analysis_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex matching exactly the given terms, shaped as a trie so matching cost does not grow with their number.
+
+    At every node the longer continuations are tried before stopping, so the first
+    match found is the longest term, as with a longest-first alternation.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return body + "?" if len(branches) > 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """Counts every occurrence of a fixed set of terms in a single pass over the text.
+
+    All terms are compiled into one case-insensitive regex. A term only matches on
+    word boundaries (an optional plural "s" is allowed), so "R" does not hit inside
+    other words and "Java" does not match "JavaScript". Overlapping terms are all
+    counted: "Google Analytics" also counts as "Analytics".
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({t.lower() for t in terms if t}, key=len, reverse=True)
+        # Zero-width lookahead so matches may overlap; the longest term wins at each position
+        self._pattern = re.compile(rf"(?<![a-z0-9])(?=({_trie_pattern(self.terms)})s?(?![a-z0-9]))") \
+            if self.terms else None
+
+        # Shorter terms that start at the same position as a longer one, e.g. "project" in "project planning"
+        known = set(self.terms)
+        self._same_start = {}
+        for term in self.terms:
+            shorter = [term[:i] for i in range(len(term) - 1, 0, -1)
+                       if term[:i] in known and not (term[i - 1].isalnum() and term[i].isalnum())]
+            if shorter:
+                self._same_start[term] = shorter
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Return {lowercase term: occurrences} for every term found in text"""
+        counts = Counter()
+        if not self._pattern or not text:
+            return counts
+        for match in self._pattern.finditer(text.lower()):
+            term = match.group(1)
+            counts[term] += 1
+            for shorter in self._same_start.get(term, ()):
+                counts[shorter] += 1
+        return counts
+
+
+def _freeze_skills(skills: Mapping[str, Iterable[str]]) -> Mapping[str, Tuple[str, ...]]:
+    return MappingProxyType({category: tuple(skill_list) for category, skill_list in (skills or {}).items()})
+
+
+class Taxonomy:
+    """An immutable, compiled skill taxonomy.
+
+    roles maps each role to {category: skills}; weights maps categories to points.
+    Aliases are matched like any other term and counted as their canonical term,
+    so count() results are keyed by lowercase canonical terms only.
+    """
+
+    def __init__(self, roles: Mapping[str, Mapping[str, Iterable[str]]], default_skills: Mapping[str, Iterable[str]],
+                 weights: Mapping[str, int], aliases: Optional[Mapping[str, Iterable[str]]] = None,
+                 industries: Optional[Mapping[str, Iterable[str]]] = None, version: Optional[str] = None):
+        self.roles = MappingProxyType({role: _freeze_skills(skills) for role, skills in roles.items()})
+        self.default_skills = _freeze_skills(default_skills)
+        self.weights = MappingProxyType(dict(weights))
+        self.industries = MappingProxyType({name: tuple(words) for name, words in (industries or {}).items()})
+
+        # Role names first, then every skill in role order, then the default skills
+        terms = list(self.roles)
+        for skills in list(self.roles.values()) + [self.default_skills]:
+            for category in self.weights:
+                terms.extend(skills.get(category, ()))
+        self.terms = tuple(dict.fromkeys(term.lower() for term in terms))
+        # Canonical spelling of every skill mentioned by a role, in role order
+        self.skills = tuple(dict.fromkeys(skill for skills in self.roles.values() for category in self.weights
+                                          for skill in skills.get(category, ())))
+
+        known = set(self.terms)
+        alias_map = {}
+        for canonical, names in (aliases or {}).items():
+            if canonical.lower() not in known:
+                raise ValueError(f"Aliases given for {canonical!r}, which is not a role or skill")
+            for name in ([names] if isinstance(names, str) else names):
+                alias = name.lower()
+                if alias in known:
+                    raise ValueError(f"Alias {name!r} of {canonical!r} is already a taxonomy term")
+                if alias_map.get(alias, canonical.lower()) != canonical.lower():
+                    raise ValueError(f"Alias {name!r} is given for both {alias_map[alias]!r} and {canonical!r}")
+                alias_map[alias] = canonical.lower()
+        self.aliases = MappingProxyType(alias_map)
+
+        # term -> roles it counts towards, so role detection only looks at the terms a text contains
+        title_index, skill_index = {}, {}
+        for role, skills in self.roles.items():
+            title_index.setdefault(role.lower(), []).append(role)
+            for category, weight in self.weights.items():
+                for skill in skills.get(category, ()):
+                    skill_index.setdefault(skill.lower(), []).append((role, weight))
+        self._title_index = MappingProxyType({term: tuple(roles) for term, roles in title_index.items()})
+        self._skill_index = MappingProxyType({term: tuple(entries) for term, entries in skill_index.items()})
+        self._role_order = {role: i for i, role in enumerate(self.roles)}
+
+        self.matcher = SkillMatcher(list(self.terms) + list(self.aliases))
+        self.version = version
+        self.digest = content_hash(json.dumps(self.to_dict(), sort_keys=True))
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Single pass over text counting every role name and skill, with aliases folded into their term"""
+        hits = self.matcher.count(text)
+        if self.aliases:
+            for alias in [term for term in hits if term in self.aliases]:
+                hits[self.aliases[alias]] += hits.pop(alias)
+        return hits
+
+    def detect_role(self, skill_hits: Mapping[str, int]) -> Tuple[Optional[str], float]:
+        """Best role for the counted terms: 10 points per title mention plus each found skill's weight"""
+        if not self.roles:
+            return None, 0
+        scores = {}
+        for term, count in skill_hits.items():
+            if not count:
+                continue
+            for role in self._title_index.get(term, ()):
+                scores[role] = scores.get(role, 0) + count * 10
+            for role, weight in self._skill_index.get(term, ()):
+                scores[role] = scores.get(role, 0) + weight
+        if not scores:
+            return next(iter(self.roles)), 0
+        # Ties go to the role listed first
+        best_role = max(scores, key=lambda role: (scores[role], -self._role_order[role]))
+        return best_role, min(100, scores[best_role] * 2)
+
+    def skills_for(self, role: Optional[str]) -> Mapping[str, Tuple[str, ...]]:
+        """A role's skills, or the default skills for unknown roles"""
+        return self.roles.get(role, self.default_skills) if role else self.default_skills
+
+    def to_dict(self) -> Dict[str, Any]:
+        canonical_aliases = {}
+        for alias, term in self.aliases.items():
+            canonical_aliases.setdefault(term, []).append(alias)
+        return {
+            "version": self.version,
+            "weights": dict(self.weights),
+            "roles": {role: {category: list(skills) for category, skills in role_skills.items()}
+                      for role, role_skills in self.roles.items()},
+            "default": {category: list(skills) for category, skills in self.default_skills.items()},
+            "industries": {name: list(words) for name, words in self.industries.items()},
+            "aliases": canonical_aliases,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], defaults: Optional["Taxonomy"] = None) -> "Taxonomy":
+        """Build from the file format; sections missing from data are taken from defaults"""
+        if not isinstance(data, Mapping) or not isinstance(data.get("roles"), Mapping):
+            raise ValueError("Taxonomy must have a 'roles' mapping")
+        weights = data.get("weights") or (defaults.weights if defaults else {})
+        for role, skills in data["roles"].items():
+            unknown = set(skills or {}) - set(weights)
+            if unknown:
+                raise ValueError(f"Role {role!r} uses categories without a weight: {', '.join(sorted(unknown))}")
+        return cls(roles=data["roles"],
+                   default_skills=data.get("default") or (defaults.default_skills if defaults else {}),
+                   weights=weights,
+                   aliases=data.get("aliases"),
+                   industries=data.get("industries") or (defaults.industries if defaults else {}),
+                   version=str(data["version"]) if data.get("version") is not None else None)
+
+
+def load_taxonomy(path: str, defaults: Optional[Taxonomy] = None) -> Taxonomy:
+    """Read and compile a JSON or YAML taxonomy file"""
+    with open(path, encoding="utf-8") as f:
+        raw = f.read()
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        import yaml
+
+        data = yaml.safe_load(raw)
+    else:
+        data = json.loads(raw)
+    return Taxonomy.from_dict(data, defaults)
+
+
+class TaxonomyStore:
+    """Holds the current Taxonomy and reloads it when its file changes.
+
+    The file's modification time is checked at most every check_interval seconds,
+    from whichever request calls get() first. A file that fails to load is logged
+    and the previous taxonomy stays in use.
+    """
+
+    def __init__(self, default: Taxonomy, path: Optional[str] = None, check_interval: float = 5):
+        self.default = default
+        self.path = path
+        self.check_interval = check_interval
+        self._current = default
+        self._signature = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        if path:
+            self.reload()
+
+    def get(self) -> Taxonomy:
+        if self.path and self.check_interval >= 0 and time.monotonic() >= self._next_check:
+            # Only one caller checks the file; everyone else keeps using the current taxonomy
+            if self._reload_lock.acquire(blocking=False):
+                try:
+                    self._next_check = time.monotonic() + self.check_interval
+                    if self._file_signature() != self._signature:
+                        self._load()
+                finally:
+                    self._reload_lock.release()
+        return self._current
+
+    def reload(self) -> bool:
+        """Load the file now; returns whether a new taxonomy is in use"""
+        with self._reload_lock:
+            return self._load()
+
+    def status(self) -> Dict[str, Any]:
+        current = self._current
+        return {"source": self.path or "built-in", "version": current.version, "digest": current.digest[:12],
+                "roles": len(current.roles), "terms": len(current.terms), "aliases": len(current.aliases)}
+
+    def _file_signature(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> bool:
+        signature = self._file_signature()
+        try:
+            taxonomy = load_taxonomy(self.path, self.default)
+        except Exception as e:
+            logger.error(f"Could not load skill taxonomy from {self.path}: {e}")
+            self._signature = signature  # don't retry until the file changes again
+            return False
+        self._signature = signature
+        self._current = taxonomy  # a single reference swap; readers see the old or the new taxonomy, never a mix
+        logger.info(f"Loaded skill taxonomy {taxonomy.version or taxonomy.digest[:12]} from {self.path} "
+                    f"({len(taxonomy.roles)} roles, {len(taxonomy.terms)} terms, {len(taxonomy.aliases)} aliases)")
+        return True
+
+
+def taxonomy_from_env(default: Taxonomy) -> TaxonomyStore:
+    """TaxonomyStore for the file in RESUME_TAXONOMY (built-in default when unset).
+
+    RESUME_TAXONOMY_CHECK_INTERVAL sets how often the file is checked for changes
+    (seconds, default 5; a negative value disables reloading).
+    """
+    return TaxonomyStore(default, path=os.environ.get("RESUME_TAXONOMY") or None,
+                         check_interval=float(os.environ.get("RESUME_TAXONOMY_CHECK_INTERVAL", 5)))
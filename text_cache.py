@@ -0,0 +1,101 @@
+"""Content-addressed cache of extracted document text.
+
+The same JD file is uploaded with every resume of a requisition and popular
+resumes are uploaded many times, so extracted text is cached by the SHA-256 of
+the file bytes (plus extension, page limit and EXTRACTION_VERSION). Uploads are
+hashed while they are read, so a repeat costs one hash and one lookup instead of
+a PDF or DOCX parse.
+
+Entries hold the extracted text with the offsets of its pages (the "--- Page N
+---" markers of PDF text) and of the lines that look like section headings.
+They live in an LRUCache: a per-process memory layer in front of a SQLite file
+that every worker on the host shares, bounded by entry count with least
+recently used eviction. The connection is opened per process, so the cache can
+be created before gunicorn forks its workers.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from analysis_cache import LRUCache, content_hash
+from chunked_summary import is_heading
+
+# Bump when the extractors change what they return, so old entries are not reused
+EXTRACTION_VERSION = "1"
+
+PAGE_MARKER = re.compile(r"^--- Page (\d+) ---$", re.MULTILINE)
+
+
+def read_hashed(stream: BinaryIO, chunk_size: int = 1 << 16) -> Tuple[bytes, str]:
+    """Read a stream to the end, hashing it chunk by chunk; returns (bytes, sha256 hex digest)"""
+    digest = hashlib.sha256()
+    chunks = []
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+
+def document_offsets(text: str) -> Dict[str, List[list]]:
+    """[page, offset] of every page marker and [heading, offset] of every heading line of extracted text"""
+    pages = [[int(match.group(1)), match.start()] for match in PAGE_MARKER.finditer(text)]
+    sections = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        if not PAGE_MARKER.match(line.rstrip("\r\n")) and is_heading(line):
+            sections.append([line.strip(), offset])
+        offset += len(line)
+    return {"pages": pages, "sections": sections}
+
+
+class TextCache:
+    """Extracted text by file content hash, shared by the resume and JD upload paths"""
+
+    def __init__(self, max_entries: int = 256, db_path: Optional[str] = None, max_disk_entries: int = 20000):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._cache = None
+        self._pid = None
+
+    def get(self, digest: str, ext: str, max_pages: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """{"text", "pages", "sections"} for a document already extracted, else None"""
+        return self._store().get(self._key(digest, ext, max_pages))
+
+    def set(self, digest: str, ext: str, max_pages: Optional[int], text: str) -> None:
+        self._store().set(self._key(digest, ext, max_pages), {"text": text, **document_offsets(text)})
+
+    def stats(self) -> Dict[str, Any]:
+        return self._store().stats()
+
+    def _key(self, digest: str, ext: str, max_pages: Optional[int]) -> str:
+        return content_hash("text", EXTRACTION_VERSION, digest, ext.lower(), str(max_pages or ""))
+
+    def _store(self) -> LRUCache:
+        # SQLite connections must not be carried across fork
+        if self._cache is None or self._pid != os.getpid():
+            self._cache = LRUCache(max_entries=self.max_entries, db_path=self.db_path,
+                                   max_disk_entries=self.max_disk_entries, name="extracted_text")
+            self._pid = os.getpid()
+        return self._cache
+
+
+def text_cache_from_env() -> Optional[TextCache]:
+    """TextCache configured by environment variables, or None when RESUME_TEXT_CACHE_SIZE is 0.
+
+    RESUME_TEXT_CACHE_SIZE: documents kept in memory per process (default 256).
+    RESUME_TEXT_CACHE_PATH: SQLite file shared by the workers (default: resume-text-cache.db in the
+    temp dir; set it empty to keep the cache per process).
+    RESUME_TEXT_CACHE_ENTRIES: documents kept in the SQLite file (default 20000).
+    """
+    size = int(os.environ.get("RESUME_TEXT_CACHE_SIZE", 256))
+    if size <= 0:
+        return None
+    db_path = os.environ.get("RESUME_TEXT_CACHE_PATH",
+                             os.path.join(tempfile.gettempdir(), "resume-text-cache.db")) or None
+    return TextCache(size, db_path, int(os.environ.get("RESUME_TEXT_CACHE_ENTRIES", 20000)))